@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.services.routing_service import RoutingService
 from app.services.health_service import HealthService
-from app.services.circuit_breaker_service import CircuitBreakerService
+from app.services.circuit_breaker_service import get_circuit_breaker_service
 from app.services.logging_service import LoggingService
 from app.schemas.route_config import RouteConfigCreate, RouteConfigUpdate, RouteConfigResponse
 from app.schemas.service_health import ServiceHealthResponse, AggregatedHealthResponse
@@ -15,8 +15,8 @@ from app.schemas.gateway_stats import GatewayStatsResponse
 
 router = APIRouter()
 
-# Global circuit breaker service instance
-circuit_breaker_service = CircuitBreakerService()
+# Shared circuit breaker service instance (also used by the proxy)
+circuit_breaker_service = get_circuit_breaker_service()
 
 
 @router.get("/routes", response_model=List[RouteConfigResponse])
@@ -109,7 +109,6 @@ async def get_gateway_health(
     """
     health_service = HealthService(db)
     health_status = await health_service.get_aggregated_health()
-    await health_service.close()
     return health_status
 
 
@@ -122,7 +121,6 @@ async def get_all_services_health(
     """
     health_service = HealthService(db)
     services = await health_service.get_all_services_health()
-    await health_service.close()
     return services
 
 
@@ -148,7 +146,6 @@ async def reset_circuit_breaker(
     # Also reset in-memory circuit breaker
     circuit_breaker_service.reset(service_name)
     
-    await health_service.close()
     return service
 
 
@@ -2,12 +2,15 @@
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.services.logging_service import LoggingService
 from app.services.health_service import HealthService
+from app.services.latency_histogram import latency_histogram
 from app.services.rate_limit_service import RateLimitService
 from app.schemas.gateway_log import GatewayLogResponse, GatewayLogFilter
 from app.schemas.gateway_stats import PerformanceMetrics
@@ -17,7 +20,9 @@ from app.schemas.rate_limit_rule import RateLimitRuleResponse
 router = APIRouter()
 
 
-@router.get("/logs", response_model=List[GatewayLogResponse])
+# Log listings skip response_model validation: rows are already plain dicts
+# and are serialized straight to JSON. The schema is still documented.
+@router.get("/logs", responses={200: {"model": List[GatewayLogResponse]}})
 async def get_gateway_logs(
     method: Optional[str] = None,
     path: Optional[str] = None,
@@ -27,7 +32,8 @@ async def get_gateway_logs(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
+    before: Optional[datetime] = None,
+    before_id: Optional[UUID] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -41,7 +47,10 @@ async def get_gateway_logs(
     - **start_date**: Filter by start date
     - **end_date**: Filter by end date
     - **limit**: Maximum number of logs to return (1-1000)
-    - **offset**: Number of logs to skip
+    - **before**, **before_id**: Cursor (created_at and id of the last log of
+      the previous page). The `X-Next-Cursor` header of a full page holds
+      both as query parameters (`before=...&before_id=...`); append it to
+      the query to get the next page.
     """
     filters = GatewayLogFilter(
         method=method,
@@ -54,8 +63,21 @@ async def get_gateway_logs(
     )
     
     logging_service = LoggingService(db)
-    logs = await logging_service.get_logs(filters=filters, limit=limit, offset=offset)
-    return logs
+    logs = await logging_service.get_logs(
+        filters=filters,
+        limit=limit,
+        before=before,
+        before_id=before_id
+    )
+    
+    headers = None
+    if len(logs) == limit:
+        last = logs[-1]
+        headers = {"X-Next-Cursor": urlencode({
+            "before": last["created_at"].isoformat(),
+            "before_id": str(last["id"]),
+        })}
+    return ORJSONResponse(logs, headers=headers)
 
 
 @router.get("/metrics")
@@ -73,7 +95,7 @@ async def get_gateway_metrics(
     return stats
 
 
-@router.get("/errors", response_model=List[GatewayLogResponse])
+@router.get("/errors", responses={200: {"model": List[GatewayLogResponse]}})
 async def get_error_logs(
     limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
@@ -85,7 +107,7 @@ async def get_error_logs(
     """
     logging_service = LoggingService(db)
     errors = await logging_service.get_error_logs(limit=limit)
-    return errors
+    return ORJSONResponse(errors)
 
 
 @router.get("/performance", response_model=PerformanceMetrics)
@@ -103,6 +125,29 @@ async def get_performance_metrics(
     return metrics
 
 
+@router.get("/performance/live", response_model=PerformanceMetrics)
+async def get_live_performance_metrics(
+    minutes: int = Query(5, ge=1, le=60)
+):
+    """
+    Get approximate response time percentiles for recent requests handled by
+    this gateway instance, from in-memory histograms (no database query).
+    
+    - **minutes**: Number of minutes to analyze (1-60, default: 5)
+    """
+    total, (p50, p90, p95, p99) = latency_histogram.percentiles(
+        (0.5, 0.9, 0.95, 0.99), minutes=minutes
+    )
+    return PerformanceMetrics(
+        p50_response_time=p50,
+        p90_response_time=p90,
+        p95_response_time=p95,
+        p99_response_time=p99,
+        total_requests=total,
+        time_period=f"Last {minutes} minutes (this instance)"
+    )
+
+
 @router.get("/rate-limits", response_model=List[RateLimitRuleResponse])
 async def get_rate_limits(
     db: AsyncSession = Depends(get_db)
@@ -134,9 +179,7 @@ async def get_service_health(
             detail=f"Service '{service_name}' not found"
         )
     
-    # Perform a health check
-    await health_service.check_service_health(service_name)
-    service = await health_service.get_service_health(service_name)
+    # Perform a health check (returns the updated record)
+    service = await health_service.check_service_health(service_name)
     
-    await health_service.close()
     return service
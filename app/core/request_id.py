@@ -0,0 +1,20 @@
+"""Request ID generation.
+
+Request IDs only need to be unique, not unpredictable, so they are drawn
+from a process-local PRNG instead of reading os.urandom on every request
+as uuid.uuid4() does.
+"""
+
+import os
+import random
+from uuid import UUID
+
+# Seeded from os.urandom once; reseeded in forked workers so they don't
+# generate the same sequence
+_random = random.Random()
+os.register_at_fork(after_in_child=_random.seed)
+
+
+def new_request_id() -> UUID:
+    """Generate a random (version 4) UUID for request tracking."""
+    return UUID(int=_random.getrandbits(128), version=4)
@@ -1,10 +1,7 @@
-"""Database base classes and common models."""
+"""Database base classes and common models.
 
-from sqlalchemy.orm import DeclarativeBase
+Model imports for table creation live in app.db.metadata_bootstrap (used
+only in development) and in the Alembic environment.
+"""
 
-# Import all models here for Alembic to detect them
 from app.db.base_class import Base  # noqa: F401
-from app.models.route_config import RouteConfig  # noqa: F401
-from app.models.rate_limit_rule import RateLimitRule  # noqa: F401
-from app.models.gateway_log import GatewayLog  # noqa: F401
-from app.models.service_health import ServiceHealth  # noqa: F401
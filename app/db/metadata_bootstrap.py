@@ -0,0 +1,24 @@
+"""Development schema bootstrap.
+
+Imports every model so they register on Base.metadata, then creates the
+tables. Only used by the development lifespan; other environments manage
+the schema with Alembic migrations and never import this module.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.base_class import Base
+from app.models.route_config import RouteConfig  # noqa: F401
+from app.models.rate_limit_rule import RateLimitRule  # noqa: F401
+from app.models.gateway_log import GatewayLog  # noqa: F401
+from app.models.gateway_log_stats import GatewayLogMinuteStats  # noqa: F401
+from app.models.service_health import ServiceHealth  # noqa: F401
+
+
+async def create_all(engine: AsyncEngine) -> None:
+    """Create all tables that don't exist yet."""
+    async with engine.begin() as conn:
+        # Required by the gateway_logs path trigram index
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,16 @@
+"""Redis client management.
+
+Provides the shared async Redis client used for rate limiting and
+cross-instance cache invalidation.
+"""
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+# Create async client (connections are opened lazily from its pool)
+redis_client = Redis.from_url(
+    settings.REDIS_URL,
+    socket_timeout=settings.REDIS_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_TIMEOUT,
+)
@@ -1,9 +1,13 @@
 """Database session management.
 
-Provides async database engine and session factory.
+Provides async database engine, session factory and the per-request
+shared session.
 """
 
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import List, Optional
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -31,6 +35,54 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Holder for the session shared by everything handling the current request;
+# set by request_session_scope(), the session in it is created on first use
+_request_session: ContextVar[Optional[List[Optional[AsyncSession]]]] = ContextVar(
+    "request_session", default=None
+)
+
+
+@asynccontextmanager
+async def request_session_scope():
+    """Share at most one session across the handling of one request.
+    
+    Middleware, services and the get_db dependency all use the same session
+    inside the scope; it is closed when the scope ends.
+    """
+    holder: List[Optional[AsyncSession]] = [None]
+    token = _request_session.set(holder)
+    try:
+        yield
+    finally:
+        _request_session.reset(token)
+        if holder[0] is not None:
+            await holder[0].close()
+
+
+def get_request_session() -> Optional[AsyncSession]:
+    """Get the current request's shared session, creating it on first use.
+    
+    Returns:
+        The shared session, or None outside a request_session_scope()
+    """
+    holder = _request_session.get()
+    if holder is None:
+        return None
+    if holder[0] is None:
+        holder[0] = AsyncSessionLocal()
+    return holder[0]
+
+
+async def release_request_session():
+    """Return the request session's connection to the pool.
+    
+    The session stays usable and reconnects if it is needed again, so a
+    connection is not held while the request is proxied upstream.
+    """
+    holder = _request_session.get()
+    if holder is not None and holder[0] is not None:
+        await holder[0].close()
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database sessions.
@@ -39,13 +91,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         @app.get("/items")
         async def get_items(db: AsyncSession = Depends(get_db)):
             ...
+    
+    Reuses the request's shared session when there is one.
     """
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    session = get_request_session()
+    if session is None:
+        session = AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
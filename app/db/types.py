@@ -0,0 +1,40 @@
+"""Custom column types.
+
+Provides compact storage types shared by the models.
+"""
+
+import enum
+from typing import Any, Dict, Mapping, Optional, Type
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class SmallIntEnum(TypeDecorator):
+    """Store a Python enum as a SMALLINT code.
+    
+    The enum keeps its string values for the API; the database only sees
+    the explicit, stable integer codes, which are 2 bytes instead of a
+    native Postgres enum and can be extended without ALTER TYPE.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: Type[enum.Enum], codes: Mapping[enum.Enum, int]):
+        super().__init__()
+        self.enum_class = enum_class
+        # Kept hashable: constructor arguments form the statement cache key
+        self.codes = tuple(codes.items())
+        self._to_code: Dict[enum.Enum, int] = dict(codes)
+        self._to_member: Dict[int, enum.Enum] = {code: member for member, code in codes.items()}
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return self._to_code[self.enum_class(value)]
+    
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[enum.Enum]:
+        if value is None:
+            return None
+        return self._to_member[value]
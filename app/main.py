@@ -4,22 +4,27 @@ This is the entry point for the Gateway Service service.
 It sets up the FastAPI app with middleware, routers, and event handlers.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.db.session import engine
-from app.db.base import Base
-from app.middleware.logging_middleware import LoggingMiddleware
-from app.middleware.auth_middleware import AuthMiddleware
-from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.db.redis import redis_client
+from app.db.session import AsyncSessionLocal, engine
+from app.middleware.cors_middleware import CORSMiddleware
+from app.middleware.gateway_middleware import GatewayMiddleware
+from app.middleware.health_middleware import HealthCheckMiddleware
+from app.services.auth_service import get_auth_service
+from app.services.proxy_service import get_proxy_service
+from app.services.log_partition_service import maintain_log_partitions
+from app.services.log_writer import gateway_log_writer
+from app.services.rate_limit_service import listen_for_rule_changes
+from app.services.routing_service import RoutingService, listen_for_route_changes
 
 # Set up logging
 setup_logging()
@@ -36,14 +41,39 @@ async def lifespan(app: FastAPI):
     
     # Create database tables (in production, use Alembic migrations)
     if settings.ENVIRONMENT == "development":
+        from app.db.metadata_bootstrap import create_all
+        
         logger.info("Creating database tables...")
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        await create_all(engine)
+    
+    # Load the route table up front so the first requests don't pay for it
+    try:
+        async with AsyncSessionLocal() as db:
+            await RoutingService(db).get_route_trie()
+    except Exception as e:
+        logger.warning(f"Could not preload route table: {e}")
+    
+    # Drop cached rate limit rules and routes when any instance changes them
+    rule_listener = asyncio.create_task(listen_for_rule_changes())
+    route_listener = asyncio.create_task(listen_for_route_changes())
+    
+    # Persist request logs in background batches
+    gateway_log_writer.start()
+    
+    # Keep monthly log partitions ahead of time and drop expired ones
+    partition_maintenance = asyncio.create_task(maintain_log_partitions())
     
     yield
     
     # Shutdown
     logger.info(f"Shutting down {settings.PROJECT_NAME}...")
+    rule_listener.cancel()
+    route_listener.cancel()
+    partition_maintenance.cancel()
+    await gateway_log_writer.stop()
+    await get_proxy_service().close()
+    await get_auth_service().close()
+    await redis_client.aclose()
     await engine.dispose()
 
 
@@ -56,6 +86,7 @@ app = FastAPI(
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add middleware (order matters - last added is executed first)
@@ -63,22 +94,23 @@ app = FastAPI(
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
+    origin_set=settings.cors_origins_set,
+    wildcard_origins=settings.cors_wildcard_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# GZip compression middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# No global GZip: proxied responses stream upstream bytes (and any upstream
+# Content-Encoding) through unchanged, and buffering them to compress would
+# defeat streaming.
 
 # Custom Gateway Middleware
-# Note: Middleware is executed in reverse order of addition
-# So the order below means: Logging -> Auth -> Rate Limit -> Request Processing
-if settings.RATE_LIMIT_ENABLED:
-    app.add_middleware(RateLimitMiddleware)
+# Runs Logging -> Auth -> Rate Limit in a single pass before request processing
+app.add_middleware(GatewayMiddleware, rate_limit_enabled=settings.RATE_LIMIT_ENABLED)
 
-app.add_middleware(AuthMiddleware)
-app.add_middleware(LoggingMiddleware)
+# Liveness probes are answered before any other middleware (added last, so outermost)
+app.add_middleware(HealthCheckMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -89,7 +121,7 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def global_exception_handler(request, exc):
     """Handle all unhandled exceptions."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
@@ -107,4 +139,6 @@ if __name__ == "__main__":
         port=settings.PORT,
         reload=settings.DEBUG,
         log_level="info",
+        loop="uvloop",
+        http="httptools",
     )
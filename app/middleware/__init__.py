@@ -1,13 +1,11 @@
 """Middleware components for the Gateway Service."""
 
-from app.middleware.rate_limit_middleware import RateLimitMiddleware
-from app.middleware.logging_middleware import LoggingMiddleware
+from app.middleware.gateway_middleware import GatewayMiddleware
 from app.middleware.cors_middleware import CORSMiddleware
-from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.health_middleware import HealthCheckMiddleware
 
 __all__ = [
-    "RateLimitMiddleware",
-    "LoggingMiddleware",
+    "GatewayMiddleware",
     "CORSMiddleware",
-    "AuthMiddleware",
+    "HealthCheckMiddleware",
 ]
@@ -1,40 +1,65 @@
 """CORS Middleware"""
-from fastapi import Request
+from typing import FrozenSet, Optional
+
 from fastapi.middleware.cors import CORSMiddleware as FastAPICORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
 
 from app.core.config import settings
 
 
-class CORSMiddleware(BaseHTTPMiddleware):
-    """Custom CORS middleware wrapper
-    
-    Note: In production, you would typically use FastAPI's built-in CORS middleware
-    or configure it in the main app. This is a wrapper for custom CORS logic.
+class CORSMiddleware(FastAPICORSMiddleware):
+    """CORS middleware with constant-time origin checks
+
+    Exact origins are looked up in a frozenset. Wildcard subdomain origins
+    ("https://*.engadi.org") are stored as suffix keys ("https://.engadi.org")
+    and matched by walking the origin's parent domains, so the cost depends
+    on the number of labels in the origin rather than the number of
+    configured origins.
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        # For now, just pass through to the built-in CORS middleware
-        # Custom CORS logic can be added here if needed
-        response = await call_next(request)
-        
-        # Add custom CORS headers if needed
-        # response.headers["Access-Control-Allow-Origin"] = "*"
-        # response.headers["Access-Control-Allow-Methods"] = "*"
-        # response.headers["Access-Control-Allow-Headers"] = "*"
-        
-        return response
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        origin_set: Optional[FrozenSet[str]] = None,
+        wildcard_origins: Optional[FrozenSet[str]] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(app, **kwargs)
+        self.origin_set = (
+            origin_set if origin_set is not None else frozenset(self.allow_origins)
+        )
+        self.wildcard_origins = wildcard_origins or frozenset()
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins or origin in self.origin_set:
+            return True
+
+        if self.wildcard_origins:
+            scheme, sep, host = origin.partition("://")
+            if sep:
+                dot = host.find(".")
+                while dot != -1:
+                    if f"{scheme}://{host[dot:]}" in self.wildcard_origins:
+                        return True
+                    dot = host.find(".", dot + 1)
+
+        return (
+            self.allow_origin_regex is not None
+            and self.allow_origin_regex.fullmatch(origin) is not None
+        )
 
 
 def setup_cors(app):
     """Setup CORS middleware for the application
-    
+
     Args:
         app: FastAPI application instance
     """
     app.add_middleware(
-        FastAPICORSMiddleware,
+        CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
+        origin_set=settings.cors_origins_set,
+        wildcard_origins=settings.cors_wildcard_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
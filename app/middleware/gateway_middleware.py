@@ -0,0 +1,259 @@
+"""Gateway Middleware - Request logging, authentication and rate limiting in one pass"""
+import time
+from typing import List, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_id import new_request_id
+from app.db.session import release_request_session, request_session_scope
+from app.services.auth_service import get_auth_service
+from app.services.latency_histogram import latency_histogram
+from app.services.log_writer import gateway_log_writer
+from app.services.rate_limit_service import RateLimitService
+from app.services.routing_service import resolve_route
+
+# Endpoints that are never rate limited
+_HEALTH_PATHS = frozenset({"/health", "/api/v1/gateway/health"})
+
+# Endpoints that never require authentication
+_PUBLIC_PATHS = _HEALTH_PATHS | {"/docs", "/redoc", "/openapi.json"}
+
+# Static 401 bodies, serialized once; the missing-header response (the
+# common case for scanners) is shared outright, as sending it never mutates it
+_MISSING_AUTH_RESPONSE = Response(
+    content=orjson.dumps({
+        "error": "unauthorized",
+        "message": "Missing authorization header"
+    }),
+    status_code=401,
+    media_type="application/json"
+)
+_INVALID_TOKEN_BODY = orjson.dumps({
+    "error": "unauthorized",
+    "message": "Invalid or expired token"
+})
+
+
+class GatewayMiddleware:
+    """Pure ASGI middleware for logging, JWT authentication and rate limiting
+
+    Runs the three checks in order (log -> auth -> rate limit) in a single
+    ASGI wrapper instead of three `BaseHTTPMiddleware` layers, each of which
+    adds a task group and response stream per request. At most one database
+    session is opened per request, and only when a cache misses; it is
+    shared with the endpoint, and its connection is released before the
+    request is passed on.
+    """
+
+    def __init__(self, app: ASGIApp, rate_limit_enabled: bool = True):
+        self.app = app
+        self.rate_limit_enabled = rate_limit_enabled
+        self.auth_service = get_auth_service()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+
+        # Generate request ID (formatted once, as 32 hex digits without the
+        # dashed canonical form, for headers) and initialize state read by
+        # later handlers, so they can use plain attribute access
+        request_id = new_request_id()
+        request_id_str = request_id.hex
+        state = request.state
+        state.request_id = request_id
+        state.request_id_str = request_id_str
+        state.user_id = None
+        state.user_context = None
+        state.target_service = None
+
+        # Get client info straight from the scope (no Address namedtuple)
+        client = scope.get("client")
+        client_ip = client[0] if client else None
+        state.client_ip = client_ip
+
+        # Record start time (monotonic, integer nanoseconds)
+        start_ns = time.perf_counter_ns()
+
+        # Process request
+        status_code = None
+        error_message = None
+        response_headers = [(b"x-request-id", request_id_str.encode("latin-1"))]
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Our values replace any the response already carries
+                names = {name for name, _ in response_headers}
+                message["headers"] = [
+                    header for header in message.get("headers", ())
+                    if header[0] not in names
+                ] + response_headers
+            await send(message)
+
+        try:
+            # One lazily opened session serves the checks below and the endpoint
+            async with request_session_scope():
+                rejection = await self._check_request(request, response_headers)
+                if rejection is not None:
+                    await rejection(scope, receive, send_wrapper)
+                else:
+                    await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error_message = str(e)
+            status_code = 500
+            raise
+        finally:
+            # Calculate response time in milliseconds
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+            latency_histogram.record(response_time)
+
+            # Queue the log row (user and target are filled in by auth and
+            # proxy); it is written in a background batch, not on this path
+            if settings.ENABLE_REQUEST_LOGGING:
+                gateway_log_writer.enqueue(
+                    request_id=request_id,
+                    method=scope["method"],
+                    path=scope["path"],
+                    target_service=state.target_service,
+                    user_id=state.user_id,
+                    client_ip=client_ip,
+                    status_code=status_code,
+                    response_time=response_time,
+                    error_message=error_message
+                )
+
+    async def _check_request(
+        self,
+        request: Request,
+        response_headers: List[Tuple[bytes, bytes]],
+    ) -> Optional[Response]:
+        """Authenticate and rate limit a request
+
+        Args:
+            request: Incoming request; user context is added to its state
+            response_headers: Headers to add to the response, extended with
+                rate limit info
+
+        Returns:
+            Error response to send instead of the request, or None to proceed
+        """
+        path = request.scope["path"]
+        method = request.scope["method"]
+        authorization = request.headers.get("Authorization")
+        try:
+            rejection = None
+
+            # Skip auth for public endpoints
+            if path not in _PUBLIC_PATHS:
+                # Check if route is public, from the in-memory route table
+                # when it is loaded; a session is only opened to (re)load it.
+                # Even without a token this lookup is needed: routes such as
+                # login are configured as public in the database.
+                route = await resolve_route(path, method)
+                if route is None or not route.is_public:
+                    if not authorization:
+                        rejection = _MISSING_AUTH_RESPONSE
+                    else:
+                        rejection = await self._authenticate(request, authorization)
+
+            # Skip rate limiting for health check endpoints
+            if (
+                rejection is None
+                and self.rate_limit_enabled
+                and path not in _HEALTH_PATHS
+            ):
+                rejection = await self._rate_limit(request, response_headers)
+
+            return rejection
+        finally:
+            # Don't hold a connection while the request is handled
+            await release_request_session()
+
+    async def _authenticate(self, request: Request, authorization: str) -> Optional[Response]:
+        """Check JWT authentication
+
+        Args:
+            request: Incoming request; user context is added to its state
+            authorization: Authorization header value
+
+        Returns:
+            401 response if the token is invalid, otherwise None
+        """
+        # Validate token (recent verifications are cached by the auth service)
+        user_context = await self.auth_service.get_user_context(authorization)
+
+        if not user_context:
+            return Response(
+                content=_INVALID_TOKEN_BODY,
+                status_code=401,
+                media_type="application/json"
+            )
+
+        # Add user context to request state
+        request.state.user_context = user_context
+        request.state.user_id = user_context.get('user_id')
+
+        return None
+
+    async def _rate_limit(
+        self,
+        request: Request,
+        response_headers: List[Tuple[bytes, bytes]],
+    ) -> Optional[Response]:
+        """Check rate limits
+
+        Args:
+            request: Incoming request
+            response_headers: Headers to add to the response
+
+        Returns:
+            429 response if a limit is exceeded, otherwise None
+        """
+        # Check rate limit; counters live in Redis and rules are cached, so the
+        # request session is only used if the rules need (re)loading
+        rate_limit_service = RateLimitService()
+        is_allowed, rate_limit_status = await rate_limit_service.check_rate_limit(
+            path=request.scope["path"],
+            user_id=request.state.user_id,
+            client_ip=request.state.client_ip
+        )
+
+        if not is_allowed and rate_limit_status:
+            # Rate limit exceeded
+            return ORJSONResponse(
+                status_code=429,
+                content={
+                    "error": "rate_limit_exceeded",
+                    "message": "Too many requests. Please try again later.",
+                    "rate_limit": {
+                        "limit": rate_limit_status.max_requests,
+                        "remaining": rate_limit_status.remaining,
+                        "reset_at": rate_limit_status.reset_at.isoformat(),
+                        "window_seconds": rate_limit_status.window_seconds
+                    }
+                },
+                headers={
+                    "X-RateLimit-Limit": str(rate_limit_status.max_requests),
+                    "X-RateLimit-Remaining": str(rate_limit_status.remaining),
+                    "X-RateLimit-Reset": rate_limit_status.reset_at.isoformat(),
+                    "Retry-After": str(rate_limit_status.window_seconds)
+                }
+            )
+
+        # Add rate limit headers to response
+        if rate_limit_status:
+            response_headers.extend((
+                (b"x-ratelimit-limit", str(rate_limit_status.max_requests).encode("latin-1")),
+                (b"x-ratelimit-remaining", str(rate_limit_status.remaining).encode("latin-1")),
+                (b"x-ratelimit-reset", rate_limit_status.reset_at.isoformat().encode("latin-1")),
+            ))
+
+        return None
@@ -0,0 +1,47 @@
+"""Health Middleware - Liveness responses served ahead of the middleware stack"""
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Liveness probe path answered without entering any other middleware;
+# the versioned /api/v1/health endpoint is still served by the app
+_FAST_PATHS = frozenset({"/health"})
+
+# The liveness body is static, so it is serialized once
+_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": settings.PROJECT_NAME,
+    "version": settings.VERSION,
+    "environment": settings.ENVIRONMENT,
+})
+_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_BODY)).encode("latin-1")),
+]
+
+
+class HealthCheckMiddleware:
+    """Pure ASGI middleware answering liveness probes directly
+
+    Added outermost so load balancer and container health checks skip
+    logging, auth, rate limiting and routing entirely. Readiness
+    (`/ready`) and aggregated gateway health still go through the app.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] == "http"
+            and scope["path"] in _FAST_PATHS
+            and scope["method"] in ("GET", "HEAD")
+        ):
+            await send({"type": "http.response.start", "status": 200, "headers": _HEADERS})
+            await send({
+                "type": "http.response.body",
+                "body": _BODY if scope["method"] == "GET" else b"",
+            })
+            return
+        await self.app(scope, receive, send)
@@ -3,4 +3,5 @@
 from app.models.route_config import RouteConfig  # noqa: F401
 from app.models.rate_limit_rule import RateLimitRule, LimitType  # noqa: F401
 from app.models.gateway_log import GatewayLog  # noqa: F401
+from app.models.gateway_log_stats import GatewayLogMinuteStats  # noqa: F401
 from app.models.service_health import ServiceHealth, ServiceStatus  # noqa: F401
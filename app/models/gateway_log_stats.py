@@ -0,0 +1,38 @@
+"""Gateway Log Stats Model"""
+from sqlalchemy import Column, String, Integer, Float, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from app.db.base_class import Base
+
+
+class GatewayLogMinuteStats(Base):
+    """Per-minute rollup of gateway logs by path and target service
+
+    Maintained by the log writer alongside each batch of gateway_logs rows,
+    so statistics read a few rows per minute instead of every request.
+    """
+    __tablename__ = "gateway_log_minute_stats"
+    __table_args__ = (
+        # Upsert key; leads with minute, so it also serves time-range scans
+        UniqueConstraint(
+            "minute", "path", "target_service", name="uq_gateway_log_minute_stats_key"
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    minute = Column(DateTime, nullable=False)
+    path = Column(String, nullable=False)
+    target_service = Column(String, nullable=False, server_default="")  # Empty when not proxied
+    total = Column(Integer, nullable=False)
+    successful = Column(Integer, nullable=False)  # 2xx and 3xx responses
+    response_time_sum = Column(Float, nullable=False)  # Milliseconds
+    response_time_count = Column(Integer, nullable=False)
+    response_time_min = Column(Float, nullable=True)
+    response_time_max = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<GatewayLogMinuteStats(minute='{self.minute}', path='{self.path}', "
+            f"total={self.total})>"
+        )
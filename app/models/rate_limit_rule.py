@@ -1,11 +1,12 @@
 """Rate Limit Rule Model"""
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
 
 from app.db.base_class import Base
+from app.db.types import SmallIntEnum
 
 
 class LimitType(str, enum.Enum):
@@ -16,17 +17,34 @@ class LimitType(str, enum.Enum):
     GLOBAL = "global"
 
 
+# Stored SMALLINT codes; never renumber, only append
+LIMIT_TYPE_CODES = {
+    LimitType.PER_USER: 1,
+    LimitType.PER_IP: 2,
+    LimitType.PER_ENDPOINT: 3,
+    LimitType.GLOBAL: 4,
+}
+
+
 class RateLimitRule(Base):
     """Rate Limit Rule for API Gateway"""
     __tablename__ = "rate_limit_rules"
+    __table_args__ = (
+        # Serves the active rules load (WHERE is_active)
+        Index(
+            "ix_rate_limit_rules_active_limit_type",
+            "limit_type",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     rule_name = Column(String, nullable=False, unique=True, index=True)
-    limit_type = Column(SQLEnum(LimitType), nullable=False, index=True)
+    limit_type = Column(SmallIntEnum(LimitType, LIMIT_TYPE_CODES), nullable=False)
     path_pattern = Column(String, nullable=True)  # Apply to specific paths (null = all paths)
     max_requests = Column(Integer, nullable=False)  # Max requests
     window_seconds = Column(Integer, nullable=False)  # Time window in seconds
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,7 +1,7 @@
 """Route Configuration Model"""
 from datetime import datetime
 from typing import List
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, ARRAY
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ARRAY, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -11,6 +11,15 @@ from app.db.base_class import Base
 class RouteConfig(Base):
     """Route Configuration for API Gateway routing"""
     __tablename__ = "route_configs"
+    __table_args__ = (
+        # Serves the active route table load (WHERE is_active ORDER BY
+        # priority DESC) without a sort
+        Index(
+            "ix_route_configs_active_priority",
+            text("priority DESC"),
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     path_pattern = Column(String, nullable=False, unique=True, index=True)  # e.g., "/api/v1/auth/*"
@@ -18,8 +27,8 @@ class RouteConfig(Base):
     target_url = Column(String, nullable=False)  # Full service URL
     methods = Column(ARRAY(String), nullable=False)  # HTTP methods allowed
     is_public = Column(Boolean, default=False)  # Requires auth or not
-    is_active = Column(Boolean, default=True, index=True)
-    priority = Column(Integer, default=0, index=True)  # Route matching priority (higher = first)
+    is_active = Column(Boolean, default=True)
+    priority = Column(Integer, default=0)  # Route matching priority (higher = first)
     timeout = Column(Integer, default=30)  # Request timeout in seconds
     retry_count = Column(Integer, default=3)  # Retry attempts
     circuit_breaker_enabled = Column(Boolean, default=True)  # Enable circuit breaker
@@ -1,11 +1,12 @@
 """Service Health Model"""
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
 
 from app.db.base_class import Base
+from app.db.types import SmallIntEnum
 
 
 class ServiceStatus(str, enum.Enum):
@@ -16,6 +17,15 @@ class ServiceStatus(str, enum.Enum):
     UNKNOWN = "unknown"
 
 
+# Stored SMALLINT codes; never renumber, only append
+SERVICE_STATUS_CODES = {
+    ServiceStatus.HEALTHY: 1,
+    ServiceStatus.UNHEALTHY: 2,
+    ServiceStatus.DEGRADED: 3,
+    ServiceStatus.UNKNOWN: 4,
+}
+
+
 class ServiceHealth(Base):
     """Service Health Monitoring"""
     __tablename__ = "service_health"
@@ -23,7 +33,12 @@ class ServiceHealth(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     service_name = Column(String, nullable=False, unique=True, index=True)
     service_url = Column(String, nullable=False)
-    status = Column(SQLEnum(ServiceStatus), nullable=False, default=ServiceStatus.UNKNOWN, index=True)
+    status = Column(
+        SmallIntEnum(ServiceStatus, SERVICE_STATUS_CODES),
+        nullable=False,
+        default=ServiceStatus.UNKNOWN,
+        index=True
+    )
     last_check_at = Column(DateTime, nullable=True)
     response_time = Column(Float, nullable=True)  # Milliseconds
     error_count = Column(Integer, default=0)
@@ -32,6 +32,7 @@ from app.schemas.proxy import (
     ProxyRequest,
     ProxyResponse,
     GatewayError,
+    ProxyError,
 )  # noqa: F401
 
 from app.schemas.gateway_stats import (
@@ -1,9 +1,16 @@
 """Proxy Request/Response Schemas"""
+from enum import Enum
 from typing import Any, Dict, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field
 
 
+class ProxyError(str, Enum):
+    """Upstream failure reported in gateway error bodies"""
+    UPSTREAM_TIMEOUT = "upstream_timeout"
+    UPSTREAM_UNREACHABLE = "upstream_unreachable"
+
+
 class ProxyRequest(BaseModel):
     """Proxy request schema"""
     method: str = Field(..., description="HTTP method")
@@ -18,7 +25,7 @@ class ProxyResponse(BaseModel):
     """Proxy response schema"""
     status_code: int = Field(..., description="Response status code")
     headers: Dict[str, str] = Field(default_factory=dict, description="Response headers")
-    body: Any = Field(..., description="Response body")
+    body: Any = Field(..., description="Response body (async iterator of raw chunks when streamed)")
     response_time: float = Field(..., description="Response time in milliseconds")
     target_service: str = Field(..., description="Target service name")
 
@@ -1,28 +1,122 @@
 """Auth Service - JWT validation and user context"""
+import asyncio
+import base64
+import hashlib
+import time
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from uuid import UUID
 import httpx
+import orjson
+from cachetools import TLRUCache
 from jose import jwt, JWTError
 
 from app.core.config import settings
 
 
+def _token_key(token: str) -> bytes:
+    """Cache key for a token (a short digest, never the token itself)"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _peek_exp(token: str) -> Optional[float]:
+    """Read a token's `exp` claim without verifying its signature
+    
+    Returns:
+        The claim, or None if the token is not a JWT with a numeric `exp`
+    """
+    try:
+        segment = token.split(".", 2)[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    except (IndexError, ValueError):
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    return exp if isinstance(exp, (int, float)) else None
+
+
+def _token_expiry(key: bytes, payload: Dict[str, Any], now: float) -> float:
+    """Time a validated payload may be served from cache until
+    
+    The cache TTL, capped at the token's own `exp` so an expired token is
+    never served.
+    """
+    expires = now + settings.AUTH_TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires = min(expires, exp)
+    return expires
+
+
 class AuthService:
     """Service for authentication and authorization"""
     
     def __init__(self):
         self.auth_service_url = settings.AUTH_SERVICE_URL
-        self.client = httpx.AsyncClient(timeout=10.0)
+        # Pooled client for remote validation: connections are kept alive so
+        # the handshake isn't paid per call, HTTP/2 is negotiated over TLS,
+        # and a failed connect is retried once. The pool is configured on the
+        # transport, since an explicit transport replaces the client's own.
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=2.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=1,
+                limits=httpx.Limits(
+                    max_keepalive_connections=settings.AUTH_SERVICE_KEEPALIVE_CONNECTIONS,
+                    max_connections=settings.AUTH_SERVICE_MAX_CONNECTIONS,
+                    keepalive_expiry=30.0,
+                ),
+            ),
+        )
+        # Validated payloads keyed by token digest; per-entry expiry is in
+        # wall-clock time so it can be compared with `exp`
+        self._token_cache: TLRUCache = TLRUCache(
+            maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+            ttu=_token_expiry,
+            timer=time.time,
+        )
+        # Remote validations in progress, keyed by token digest, so
+        # concurrent requests with the same token share one call
+        self._inflight: Dict[bytes, asyncio.Future] = {}
     
     async def validate_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Validate JWT token via Auth Service
         
+        Recent successful validations are served from an in-process cache,
+        skipping signature verification and remote calls.
+        
         Args:
             token: JWT token
             
         Returns:
             User context dict or None if invalid
         """
+        key = _token_key(token)
+        payload = self._token_cache.get(key)
+        if payload is not None:
+            return payload
+        
+        payload = await self._validate_uncached(key, token)
+        if payload is not None:
+            self._token_cache[key] = payload
+        return payload
+    
+    def invalidate(self, token: str):
+        """Drop a token's cached validation, e.g. when it is revoked
+        
+        Args:
+            token: JWT token
+        """
+        self._token_cache.pop(_token_key(token), None)
+    
+    async def _validate_uncached(self, key: bytes, token: str) -> Optional[Dict[str, Any]]:
+        """Validate a token locally, falling back to the Auth Service"""
+        # Reject expired tokens before spending a signature verification
+        # (or a remote call) on them
+        exp = _peek_exp(token)
+        if exp is not None and exp <= time.time():
+            return None
+        
         try:
             # Try to decode token locally first (faster)
             payload = jwt.decode(
@@ -33,18 +127,29 @@ class AuthService:
             return payload
             
         except JWTError:
-            # If local validation fails, try remote validation
-            try:
-                response = await self.client.get(
-                    f"{self.auth_service_url}/api/v1/auth/validate",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                
-            except httpx.HTTPError:
-                pass
+            # If local validation fails, try remote validation, joining a
+            # call already in flight for the same token
+            future = self._inflight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(self._validate_remote(token))
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shielded so one cancelled caller doesn't cancel the others
+            return await asyncio.shield(future)
+    
+    async def _validate_remote(self, token: str) -> Optional[Dict[str, Any]]:
+        """Validate a token with the Auth Service"""
+        try:
+            response = await self.client.get(
+                f"{self.auth_service_url}/api/v1/auth/validate",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            
+            if response.status_code == 200:
+                return orjson.loads(response.content)
+            
+        except httpx.HTTPError:
+            pass
         
         return None
     
@@ -57,13 +162,15 @@ class AuthService:
         Returns:
             Token string or None
         """
-        if not authorization:
+        # One length check and one prefix compare; an empty token is rejected
+        if (
+            authorization is None
+            or len(authorization) < 8
+            or authorization[:7] != 'Bearer '
+        ):
             return None
         
-        if authorization.startswith('Bearer '):
-            return authorization[7:]
-        
-        return None
+        return authorization[7:]
     
     async def get_user_context(self, authorization: Optional[str]) -> Optional[Dict[str, Any]]:
         """Get user context from authorization header
@@ -97,3 +204,9 @@ class AuthService:
     async def close(self):
         """Close HTTP client"""
         await self.client.aclose()
+
+
+@lru_cache
+def get_auth_service() -> AuthService:
+    """Get the shared auth service instance"""
+    return AuthService()
@@ -0,0 +1,88 @@
+"""Cache Invalidation - Process-wide caches kept in sync over Redis pub/sub"""
+import asyncio
+import logging
+import time
+from typing import Generic, Optional, TypeVar
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.db.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class VersionedTTLCache(Generic[T]):
+    """Process-wide cache of one value loaded from the database
+
+    The value is reloaded after `ttl` seconds or when invalidated, e.g. by
+    CRUD on any gateway instance (see `listen_for_invalidations`). Loaders
+    read `version` before loading and pass it to `set`, holding `lock` so
+    concurrent misses load once.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._value: Optional[T] = None
+        self._expires_at = 0.0
+        # Bumped on every invalidation so in-flight reloads don't store stale data
+        self.version = 0
+        self.lock = asyncio.Lock()
+
+    def get(self) -> Optional[T]:
+        """Get the cached value if it is still fresh"""
+        if self._value is not None and time.monotonic() < self._expires_at:
+            return self._value
+        return None
+
+    def set(self, value: T, version: int) -> bool:
+        """Store a freshly loaded value unless it changed while loading
+
+        Returns:
+            True if the value was stored
+        """
+        if version != self.version:
+            return False
+        self._value = value
+        self._expires_at = time.monotonic() + self.ttl
+        return True
+
+    def invalidate(self):
+        """Drop the cached value so the next request reloads it"""
+        self.version += 1
+        self._value = None
+
+
+async def publish_invalidation(channel: str):
+    """Tell every gateway instance to drop the cache behind a channel"""
+    try:
+        await redis_client.publish(channel, b"invalidate")
+    except RedisError as e:
+        # Other instances still pick up the change once their cache TTL expires
+        logger.warning(f"Could not publish invalidation on {channel}: {e}")
+
+
+async def listen_for_invalidations(channel: str, cache: VersionedTTLCache):
+    """Invalidate a local cache on pub/sub notifications
+
+    Runs for the lifetime of the application; reconnects on Redis errors.
+    """
+    reconnecting = False
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            if reconnecting:
+                # Changes made while disconnected were missed; the initial
+                # subscribe keeps a cache preloaded at startup
+                cache.invalidate()
+            reconnecting = True
+            async for _ in pubsub.listen():
+                cache.invalidate()
+        except RedisError as e:
+            logger.warning(f"Subscription to {channel} lost: {e}")
+            await asyncio.sleep(settings.REDIS_TIMEOUT * 10)
+        finally:
+            await pubsub.aclose()
@@ -1,8 +1,13 @@
 """Circuit Breaker Service - Implement circuit breaker pattern"""
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Optional
 from enum import Enum
 
+from app.core.config import settings
+
 
 class CircuitState(str, Enum):
     """Circuit breaker states"""
@@ -11,8 +16,43 @@ class CircuitState(str, Enum):
     HALF_OPEN = "half_open"  # Testing if service recovered
 
 
+@dataclass(slots=True)
+class CircuitEntry:
+    """Breaker state for one service
+    
+    Times are `time.monotonic()` readings, so timeouts are unaffected by
+    wall-clock changes.
+    """
+    state: CircuitState = CircuitState.CLOSED
+    failure_count: int = 0
+    success_count: int = 0
+    last_failure_time: Optional[float] = None
+    last_state_change: float = field(default_factory=time.monotonic)
+    # When the current half-open probe was admitted, None if there is none
+    probe_started: Optional[float] = None
+    
+    def transition(self, state: CircuitState, now: float):
+        """Move to a new state, restarting the success count"""
+        self.state = state
+        self.success_count = 0
+        self.last_state_change = now
+        self.probe_started = None
+
+
+def _wall_time(monotonic_time: Optional[float]) -> Optional[datetime]:
+    """Convert a monotonic reading to UTC wall-clock time for display"""
+    if monotonic_time is None:
+        return None
+    return datetime.utcnow() - timedelta(seconds=time.monotonic() - monotonic_time)
+
+
 class CircuitBreakerService:
-    """Service for implementing circuit breaker pattern"""
+    """Service for implementing circuit breaker pattern
+    
+    State is per process and only touched from the event loop. No method
+    awaits, so each check-and-transition runs to completion without another
+    request interleaving, and no locks are needed.
+    """
     
     def __init__(
         self,
@@ -31,19 +71,14 @@ class CircuitBreakerService:
         self.timeout = timeout
         
         # Circuit states per service
-        self._circuits: Dict[str, Dict] = {}
+        self._circuits: Dict[str, CircuitEntry] = {}
     
-    def _get_circuit(self, service_name: str) -> Dict:
+    def _get_circuit(self, service_name: str) -> CircuitEntry:
         """Get or create circuit for a service"""
-        if service_name not in self._circuits:
-            self._circuits[service_name] = {
-                'state': CircuitState.CLOSED,
-                'failure_count': 0,
-                'success_count': 0,
-                'last_failure_time': None,
-                'last_state_change': datetime.utcnow()
-            }
-        return self._circuits[service_name]
+        circuit = self._circuits.get(service_name)
+        if circuit is None:
+            circuit = self._circuits[service_name] = CircuitEntry()
+        return circuit
     
     def is_available(self, service_name: str) -> bool:
         """Check if service is available for requests
@@ -54,26 +89,41 @@ class CircuitBreakerService:
         Returns:
             True if service is available, False otherwise
         """
-        circuit = self._get_circuit(service_name)
-        
-        # If circuit is closed, always available
-        if circuit['state'] == CircuitState.CLOSED:
+        # If there is no circuit yet or it is closed, always available; an
+        # entry is only created once a failure is recorded
+        circuit = self._circuits.get(service_name)
+        if circuit is None or circuit.state is CircuitState.CLOSED:
             return True
         
         # If circuit is open, check if timeout expired
-        if circuit['state'] == CircuitState.OPEN:
-            if circuit['last_failure_time']:
-                elapsed = (datetime.utcnow() - circuit['last_failure_time']).seconds
-                if elapsed >= self.timeout:
-                    # Try half-open
-                    circuit['state'] = CircuitState.HALF_OPEN
-                    circuit['success_count'] = 0
-                    circuit['last_state_change'] = datetime.utcnow()
+        if circuit.state is CircuitState.OPEN:
+            if circuit.last_failure_time is not None:
+                now = time.monotonic()
+                if now - circuit.last_failure_time >= self.timeout:
+                    # Try half-open, admitting this request as the probe
+                    circuit.transition(CircuitState.HALF_OPEN, now)
+                    circuit.probe_started = now
                     return True
             return False
         
-        # If half-open, allow requests to test
-        return True
+        # If half-open, admit one probe at a time; the rest are rejected as
+        # if open rather than all rushing the recovering service
+        now = time.monotonic()
+        if self._probe_free(circuit, now):
+            circuit.probe_started = now
+            return True
+        return False
+    
+    def _probe_free(self, circuit: CircuitEntry, now: float) -> bool:
+        """Whether a half-open circuit can admit a probe
+        
+        A probe whose outcome was never recorded stops blocking after
+        `timeout` seconds.
+        """
+        return (
+            circuit.probe_started is None
+            or now - circuit.probe_started >= self.timeout
+        )
     
     def record_success(self, service_name: str):
         """Record successful request
@@ -81,21 +131,23 @@ class CircuitBreakerService:
         Args:
             service_name: Name of the service
         """
-        circuit = self._get_circuit(service_name)
+        circuit = self._circuits.get(service_name)
+        if circuit is None:
+            # Never failed, nothing to update
+            return
         
-        if circuit['state'] == CircuitState.HALF_OPEN:
-            circuit['success_count'] += 1
+        if circuit.state is CircuitState.HALF_OPEN:
+            circuit.probe_started = None
+            circuit.success_count += 1
             
             # If enough successes, close the circuit
-            if circuit['success_count'] >= self.success_threshold:
-                circuit['state'] = CircuitState.CLOSED
-                circuit['failure_count'] = 0
-                circuit['success_count'] = 0
-                circuit['last_state_change'] = datetime.utcnow()
+            if circuit.success_count >= self.success_threshold:
+                circuit.transition(CircuitState.CLOSED, time.monotonic())
+                circuit.failure_count = 0
         
-        elif circuit['state'] == CircuitState.CLOSED:
+        elif circuit.state is CircuitState.CLOSED and circuit.failure_count:
             # Reset failure count on success
-            circuit['failure_count'] = max(0, circuit['failure_count'] - 1)
+            circuit.failure_count -= 1
     
     def record_failure(self, service_name: str):
         """Record failed request
@@ -104,20 +156,18 @@ class CircuitBreakerService:
             service_name: Name of the service
         """
         circuit = self._get_circuit(service_name)
-        circuit['failure_count'] += 1
-        circuit['last_failure_time'] = datetime.utcnow()
+        now = time.monotonic()
+        circuit.failure_count += 1
+        circuit.last_failure_time = now
         
         # If half-open and failed, go back to open
-        if circuit['state'] == CircuitState.HALF_OPEN:
-            circuit['state'] = CircuitState.OPEN
-            circuit['success_count'] = 0
-            circuit['last_state_change'] = datetime.utcnow()
+        if circuit.state is CircuitState.HALF_OPEN:
+            circuit.transition(CircuitState.OPEN, now)
         
         # If closed and reached threshold, open the circuit
-        elif circuit['state'] == CircuitState.CLOSED:
-            if circuit['failure_count'] >= self.failure_threshold:
-                circuit['state'] = CircuitState.OPEN
-                circuit['last_state_change'] = datetime.utcnow()
+        elif circuit.state is CircuitState.CLOSED:
+            if circuit.failure_count >= self.failure_threshold:
+                circuit.transition(CircuitState.OPEN, now)
     
     def get_state(self, service_name: str) -> CircuitState:
         """Get current circuit state
@@ -129,7 +179,7 @@ class CircuitBreakerService:
             Current circuit state
         """
         circuit = self._get_circuit(service_name)
-        return circuit['state']
+        return circuit.state
     
     def reset(self, service_name: str):
         """Reset circuit breaker for a service
@@ -138,13 +188,7 @@ class CircuitBreakerService:
             service_name: Name of the service
         """
         if service_name in self._circuits:
-            self._circuits[service_name] = {
-                'state': CircuitState.CLOSED,
-                'failure_count': 0,
-                'success_count': 0,
-                'last_failure_time': None,
-                'last_state_change': datetime.utcnow()
-            }
+            self._circuits[service_name] = CircuitEntry()
     
     def get_circuit_info(self, service_name: str) -> Dict:
         """Get detailed circuit information
@@ -156,12 +200,35 @@ class CircuitBreakerService:
             Circuit information
         """
         circuit = self._get_circuit(service_name)
+        
+        # Same answer as is_available, without admitting a probe
+        now = time.monotonic()
+        if circuit.state is CircuitState.OPEN:
+            available = (
+                circuit.last_failure_time is not None
+                and now - circuit.last_failure_time >= self.timeout
+            )
+        elif circuit.state is CircuitState.HALF_OPEN:
+            available = self._probe_free(circuit, now)
+        else:
+            available = True
+        
         return {
             'service_name': service_name,
-            'state': circuit['state'],
-            'failure_count': circuit['failure_count'],
-            'success_count': circuit['success_count'],
-            'last_failure_time': circuit['last_failure_time'],
-            'last_state_change': circuit['last_state_change'],
-            'is_available': self.is_available(service_name)
+            'state': circuit.state,
+            'failure_count': circuit.failure_count,
+            'success_count': circuit.success_count,
+            'last_failure_time': _wall_time(circuit.last_failure_time),
+            'last_state_change': _wall_time(circuit.last_state_change),
+            'is_available': available
         }
+
+
+@lru_cache
+def get_circuit_breaker_service() -> CircuitBreakerService:
+    """Get the shared circuit breaker service instance"""
+    return CircuitBreakerService(
+        failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        success_threshold=settings.CIRCUIT_BREAKER_SUCCESS_THRESHOLD,
+        timeout=settings.CIRCUIT_BREAKER_TIMEOUT
+    )
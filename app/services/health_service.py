@@ -1,12 +1,34 @@
 """Health Service - Service health monitoring"""
+import time
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.models.service_health import ServiceHealth, ServiceStatus
-from app.schemas.service_health import ServiceHealthCreate, ServiceHealthUpdate, AggregatedHealthResponse
-from app.services.proxy_service import ProxyService
+from app.schemas.service_health import (
+    ServiceHealthCreate,
+    ServiceHealthUpdate,
+    AggregatedHealthResponse,
+    ServiceHealthResponse,
+)
+from app.services.proxy_service import get_proxy_service
+
+# Last aggregated health response and when it expires (monotonic); reset
+# whenever this process changes a health record
+_aggregated_cache: Optional[Tuple[float, AggregatedHealthResponse]] = None
+
+# Validates a whole list of records in one call
+_SERVICES_ADAPTER = TypeAdapter(List[ServiceHealthResponse])
+
+
+def invalidate_aggregated_health():
+    """Drop the cached aggregated health response"""
+    global _aggregated_cache
+    _aggregated_cache = None
 
 
 class HealthService:
@@ -14,7 +36,7 @@ class HealthService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.proxy_service = ProxyService()
+        self.proxy_service = get_proxy_service()
     
     async def check_service_health(self, service_name: str) -> Optional[ServiceHealth]:
         """Check health of a specific service
@@ -34,9 +56,49 @@ class HealthService:
             return None
         
         # Perform health check
-        is_healthy, response_time = await self.proxy_service.health_check(service.service_url)
+        is_healthy, response_time = await self.proxy_service.health_check(
+            service.service_url, timeout=settings.HEALTH_CHECK_TIMEOUT
+        )
+        
+        self._apply_health_result(service, is_healthy, response_time)
+        await self.db.commit()
+        invalidate_aggregated_health()
+        return service
+    
+    async def check_all_services(self) -> List[ServiceHealth]:
+        """Check health of all registered services
+        
+        Probes run concurrently, so a cycle takes
+        as long as the slowest service rather than the sum of all of them,
+        and all results are saved in one commit.
+        
+        Returns:
+            List of updated ServiceHealth records
+        """
+        stmt = select(ServiceHealth)
+        result = await self.db.execute(stmt)
+        services = result.scalars().all()
+        
+        results = await self.proxy_service.health_check_many(
+            [service.service_url for service in services],
+            timeout=settings.HEALTH_CHECK_TIMEOUT
+        )
+        
+        for service, (is_healthy, response_time) in zip(services, results):
+            self._apply_health_result(service, is_healthy, response_time)
         
-        # Update service record
+        # The records already hold the new state, so nothing is refreshed
+        await self.db.commit()
+        invalidate_aggregated_health()
+        return list(services)
+    
+    def _apply_health_result(
+        self,
+        service: ServiceHealth,
+        is_healthy: bool,
+        response_time: float
+    ):
+        """Apply a health check result to a service record (without saving it)"""
         service.last_check_at = datetime.utcnow()
         service.response_time = response_time
         
@@ -56,28 +118,6 @@ class HealthService:
                 service.circuit_open = True
             elif service.error_count >= 2:
                 service.status = ServiceStatus.DEGRADED
-        
-        await self.db.commit()
-        await self.db.refresh(service)
-        return service
-    
-    async def check_all_services(self) -> List[ServiceHealth]:
-        """Check health of all registered services
-        
-        Returns:
-            List of updated ServiceHealth records
-        """
-        stmt = select(ServiceHealth)
-        result = await self.db.execute(stmt)
-        services = result.scalars().all()
-        
-        updated_services = []
-        for service in services:
-            updated = await self.check_service_health(service.service_name)
-            if updated:
-                updated_services.append(updated)
-        
-        return updated_services
     
     async def get_service_health(self, service_name: str) -> Optional[ServiceHealth]:
         """Get health status of a service"""
@@ -94,14 +134,24 @@ class HealthService:
     async def get_aggregated_health(self) -> AggregatedHealthResponse:
         """Get aggregated health status
         
+        Served from a short-lived in-process cache, as it is polled often and
+        only changes when a health check completes.
+        
         Returns:
             Aggregated health response
         """
+        global _aggregated_cache
+        now = time.monotonic()
+        if _aggregated_cache is not None and now < _aggregated_cache[0]:
+            return _aggregated_cache[1]
+        
         services = await self.get_all_services_health()
         
-        healthy = sum(1 for s in services if s.status == ServiceStatus.HEALTHY)
-        unhealthy = sum(1 for s in services if s.status == ServiceStatus.UNHEALTHY)
-        degraded = sum(1 for s in services if s.status == ServiceStatus.DEGRADED)
+        # Tally all statuses in one pass
+        counts = Counter(s.status for s in services)
+        healthy = counts[ServiceStatus.HEALTHY]
+        unhealthy = counts[ServiceStatus.UNHEALTHY]
+        degraded = counts[ServiceStatus.DEGRADED]
         
         # Determine overall status
         if unhealthy > 0:
@@ -113,14 +163,16 @@ class HealthService:
         else:
             overall_status = ServiceStatus.UNKNOWN
         
-        return AggregatedHealthResponse(
+        response = AggregatedHealthResponse(
             overall_status=overall_status,
             total_services=len(services),
             healthy_services=healthy,
             unhealthy_services=unhealthy,
             degraded_services=degraded,
-            services=[ServiceHealthResponse.model_validate(s) for s in services]
+            services=_SERVICES_ADAPTER.validate_python(services, from_attributes=True)
         )
+        _aggregated_cache = (now + settings.HEALTH_AGGREGATE_CACHE_TTL, response)
+        return response
     
     async def register_service(self, service_data: ServiceHealthCreate) -> ServiceHealth:
         """Register a new service for health monitoring"""
@@ -132,6 +184,7 @@ class HealthService:
         self.db.add(service)
         await self.db.commit()
         await self.db.refresh(service)
+        invalidate_aggregated_health()
         return service
     
     async def reset_circuit_breaker(self, service_name: str) -> Optional[ServiceHealth]:
@@ -153,6 +206,7 @@ class HealthService:
         
         await self.db.commit()
         await self.db.refresh(service)
+        invalidate_aggregated_health()
         return service
     
     async def is_circuit_open(self, service_name: str) -> bool:
@@ -168,11 +222,4 @@ class HealthService:
         if service:
             return service.circuit_open
         return False
-    
-    async def close(self):
-        """Close proxy service client"""
-        await self.proxy_service.close()
-
 
-# Fix import
-from app.schemas.service_health import ServiceHealthResponse
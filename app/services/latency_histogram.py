@@ -0,0 +1,99 @@
+"""Latency Histogram - Streaming response time percentiles for this instance"""
+import math
+import time
+from collections import Counter, deque
+from typing import Deque, List, Sequence, Tuple
+
+from app.core.config import settings
+
+# Bucket bounds grow by 2%, so a reported percentile is within about 1% of
+# the exact value; anything under the minimum shares the first bucket
+_GROWTH = 1.02
+_LOG_GROWTH = math.log(_GROWTH)
+_MIN_MS = 0.01
+
+
+def _bucket(response_time: float) -> int:
+    """Histogram bucket for a response time in milliseconds"""
+    if response_time <= _MIN_MS:
+        return 0
+    return int(math.log(response_time / _MIN_MS) / _LOG_GROWTH)
+
+
+def _bucket_value(bucket: int) -> float:
+    """Representative (geometric midpoint) value of a bucket"""
+    return _MIN_MS * _GROWTH ** (bucket + 0.5)
+
+
+class LatencyHistogram:
+    """Per-minute log-bucketed histograms of response times
+
+    Recording a request is a bucket computation and a counter increment, with
+    no list to grow or sort. Percentiles over a window merge the per-minute
+    histograms, whose size depends on the spread of response times (a few
+    hundred buckets at most), not on the number of requests. Minutes older
+    than `window_minutes` are discarded.
+
+    Counts cover this process only; the database remains the source of
+    gateway-wide and longer-term metrics.
+    """
+
+    def __init__(self, window_minutes: int):
+        self.window_minutes = window_minutes
+        self._minutes: Deque[Tuple[int, Counter]] = deque()
+
+    def record(self, response_time: float):
+        """Add one response time (milliseconds)"""
+        minute = int(time.time() // 60)
+        if not self._minutes or self._minutes[-1][0] != minute:
+            self._minutes.append((minute, Counter()))
+            self._expire(minute)
+        self._minutes[-1][1][_bucket(response_time)] += 1
+
+    def percentiles(
+        self,
+        quantiles: Sequence[float],
+        minutes: int
+    ) -> Tuple[int, List[float]]:
+        """Approximate response time percentiles over recent minutes
+
+        Args:
+            quantiles: Quantiles to report, each between 0 and 1
+            minutes: Number of minutes (including the current one) to cover
+
+        Returns:
+            Tuple of (request count, percentile values); values are 0 when
+            there were no requests
+        """
+        now = int(time.time() // 60)
+        self._expire(now)
+        merged: Counter = Counter()
+        for minute, counts in self._minutes:
+            if minute > now - minutes:
+                merged.update(counts)
+
+        total = sum(merged.values())
+        if not total:
+            return 0, [0.0] * len(quantiles)
+
+        # Walk the buckets once, in order, for all quantiles (nearest rank)
+        ranks = [max(1, math.ceil(q * total)) for q in quantiles]
+        values = [0.0] * len(quantiles)
+        order = sorted(range(len(ranks)), key=ranks.__getitem__)
+        seen = 0
+        next_index = 0
+        for bucket in sorted(merged):
+            seen += merged[bucket]
+            while next_index < len(order) and ranks[order[next_index]] <= seen:
+                values[order[next_index]] = _bucket_value(bucket)
+                next_index += 1
+        return total, values
+
+    def _expire(self, minute: int):
+        """Drop minutes that fell out of the window"""
+        while self._minutes and self._minutes[0][0] <= minute - self.window_minutes:
+            self._minutes.popleft()
+
+
+# Global histogram fed by the gateway middleware
+latency_histogram = LatencyHistogram(window_minutes=settings.LATENCY_WINDOW_MINUTES)
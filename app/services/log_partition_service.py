@@ -0,0 +1,181 @@
+"""Log Partition Service - Monthly gateway_logs partition and stats retention maintenance"""
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Iterable, List
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.gateway_log_stats import GatewayLogMinuteStats
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r"gateway_logs_(\d{4})_(\d{2})")
+
+# Catch-all partition for rows outside the monthly ones (migration d10dd01feb19)
+_DEFAULT_PARTITION = "gateway_logs_default"
+
+_IS_PARTITIONED_STMT = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+    "WHERE partrelid = to_regclass('gateway_logs'))"
+)
+_PARTITIONS_STMT = text(
+    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = 'gateway_logs'::regclass"
+)
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after the one containing `day`"""
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding rows for the given month"""
+    return f"gateway_logs_{month:%Y_%m}"
+
+
+def expired_partitions(names: Iterable[str], cutoff: date) -> List[str]:
+    """Monthly partitions whose rows are all older than `cutoff`
+
+    Args:
+        names: Partition table names
+        cutoff: Oldest date to retain
+
+    Returns:
+        Names of partitions that can be dropped
+    """
+    expired = []
+    for name in names:
+        match = _PARTITION_NAME.fullmatch(name)
+        if match and month_start(date(int(match[1]), int(match[2]), 1), 1) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+class LogPartitionService:
+    """Creates upcoming gateway_logs partitions and drops expired ones
+
+    gateway_logs is range-partitioned by month on created_at, so retention
+    is an instant DROP TABLE per month rather than a DELETE and vacuum.
+    Does nothing when the table is not partitioned (e.g. created by
+    create_all in development).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def is_partitioned(self) -> bool:
+        """Check whether gateway_logs is a partitioned table"""
+        result = await self.db.execute(_IS_PARTITIONED_STMT)
+        return bool(result.scalar())
+
+    async def ensure_partitions(self, months_ahead: int = settings.LOG_PARTITION_PREMAKE):
+        """Create partitions for the current month and the next `months_ahead`
+
+        Months whose partition already exists are skipped, and each new
+        partition is created in its own transaction.
+        """
+        result = await self.db.execute(_PARTITIONS_STMT)
+        existing = set(result.scalars().all())
+        has_default = _DEFAULT_PARTITION in existing
+        today = datetime.utcnow().date()
+        for offset in range(months_ahead + 1):
+            month = month_start(today, offset)
+            name = partition_name(month)
+            if name not in existing:
+                await self._create_partition(name, month, has_default)
+                await self.db.commit()
+
+    async def _create_partition(self, name: str, month: date, has_default: bool):
+        """Create the partition for one month
+
+        If rows for the month already landed in the default partition (e.g.
+        maintenance was down at the start of the month), creating the
+        partition would fail the default partition's constraint. The default
+        partition is detached, the month's rows are moved into the new
+        partition and the default is attached again, in the caller's
+        transaction.
+        """
+        start, end = month, month_start(month, 1)
+        create = text(
+            f"CREATE TABLE {name} PARTITION OF gateway_logs "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        if not has_default:
+            await self.db.execute(create)
+            return
+
+        await self.db.execute(text(
+            f"ALTER TABLE gateway_logs DETACH PARTITION {_DEFAULT_PARTITION}"
+        ))
+        await self.db.execute(create)
+        await self.db.execute(text(
+            f"WITH moved AS ("
+            f"DELETE FROM {_DEFAULT_PARTITION} "
+            f"WHERE created_at >= '{start}' AND created_at < '{end}' RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await self.db.execute(text(
+            f"ALTER TABLE gateway_logs ATTACH PARTITION {_DEFAULT_PARTITION} DEFAULT"
+        ))
+
+    async def drop_expired_partitions(
+        self,
+        retention_days: int = settings.GATEWAY_LOG_RETENTION_DAYS,
+    ) -> List[str]:
+        """Drop monthly partitions older than the retention period
+
+        Returns:
+            Names of the dropped partitions
+        """
+        cutoff = datetime.utcnow().date() - timedelta(days=retention_days)
+        result = await self.db.execute(_PARTITIONS_STMT)
+        expired = expired_partitions(result.scalars().all(), cutoff)
+        for name in expired:
+            await self.db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        await self.db.commit()
+        return expired
+
+    async def delete_expired_stats(
+        self,
+        retention_days: int = settings.GATEWAY_LOG_RETENTION_DAYS,
+    ):
+        """Delete per-minute stats rows older than the retention period"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        await self.db.execute(
+            delete(GatewayLogMinuteStats).where(GatewayLogMinuteStats.minute < cutoff)
+        )
+        await self.db.commit()
+
+    async def maintain(self):
+        """Apply stats retention, then run partition creation and retention
+        if the table is partitioned"""
+        await self.delete_expired_stats()
+        if not await self.is_partitioned():
+            return
+        # Retention must not stop because a partition can't be created
+        try:
+            await self.ensure_partitions()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Could not create gateway log partitions: {e}")
+        dropped = await self.drop_expired_partitions()
+        if dropped:
+            logger.info(f"Dropped expired gateway log partitions: {', '.join(dropped)}")
+
+
+async def maintain_log_partitions():
+    """Run partition maintenance periodically for the lifetime of the application"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await LogPartitionService(db).maintain()
+        except Exception as e:
+            logger.warning(f"Gateway log partition maintenance failed: {e}")
+        await asyncio.sleep(settings.LOG_PARTITION_CHECK_INTERVAL)
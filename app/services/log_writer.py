@@ -0,0 +1,266 @@
+"""Log Writer - Batched gateway log persistence off the request path"""
+import asyncio
+import ipaddress
+import logging
+import uuid
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.gateway_log import GatewayLog
+from app.models.gateway_log_stats import GatewayLogMinuteStats
+
+logger = logging.getLogger(__name__)
+
+# Columns written by COPY, in record order; `id` is generated per row and
+# updated_at is left to the database
+_COPY_COLUMNS = (
+    "id",
+    "request_id",
+    "method",
+    "path",
+    "target_service",
+    "user_id",
+    "client_ip",
+    "status_code",
+    "response_time",
+    "error_message",
+    "created_at",
+)
+
+# Adds a batch's per-minute rollup to the existing rows
+_stats = GatewayLogMinuteStats.__table__
+_stats_insert = insert(_stats)
+_STATS_UPSERT = _stats_insert.on_conflict_do_update(
+    constraint="uq_gateway_log_minute_stats_key",
+    set_={
+        "total": _stats.c.total + _stats_insert.excluded.total,
+        "successful": _stats.c.successful + _stats_insert.excluded.successful,
+        "response_time_sum": (
+            _stats.c.response_time_sum + _stats_insert.excluded.response_time_sum
+        ),
+        "response_time_count": (
+            _stats.c.response_time_count + _stats_insert.excluded.response_time_count
+        ),
+        "response_time_min": func.least(
+            _stats.c.response_time_min, _stats_insert.excluded.response_time_min
+        ),
+        "response_time_max": func.greatest(
+            _stats.c.response_time_max, _stats_insert.excluded.response_time_max
+        ),
+        "updated_at": func.now(),
+    },
+)
+
+
+def _parse_ip(
+    value: Optional[str]
+) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    """Client address for the INET column, or None if it is not an IP"""
+    if value is None:
+        return None
+    try:
+        return ipaddress.ip_address(value)
+    except ValueError:
+        return None
+
+
+def _parse_uuid(value: Any) -> Optional[uuid.UUID]:
+    """User ID for the UUID column, or None if it is not a UUID
+    
+    The value is the token's user_id claim, so it is not trusted to be one.
+    """
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _copy_records(rows: List[Dict[str, Any]]) -> List[tuple]:
+    """COPY records for a batch, in _COPY_COLUMNS order
+    
+    Values from the request (client address, user_id claim) are parsed here
+    rather than on the request path; one bad value becomes NULL instead of
+    failing the whole batch.
+    """
+    for row in rows:
+        row["client_ip"] = _parse_ip(row.get("client_ip"))
+        row["user_id"] = _parse_uuid(row.get("user_id"))
+    return [
+        (uuid.uuid4(), *[row.get(column) for column in _COPY_COLUMNS[1:]])
+        for row in rows
+    ]
+
+
+def _minute_stats(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate a batch of log rows per (minute, path, target service)
+    
+    Returns:
+        gateway_log_minute_stats rows, sorted by key so concurrent writers
+        lock existing rows in the same order
+    """
+    stats: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = (
+            row["created_at"].replace(second=0, microsecond=0),
+            row["path"],
+            row.get("target_service") or "",
+        )
+        entry = stats.get(key)
+        if entry is None:
+            entry = stats[key] = {
+                "minute": key[0],
+                "path": key[1],
+                "target_service": key[2],
+                "total": 0,
+                "successful": 0,
+                "response_time_sum": 0.0,
+                "response_time_count": 0,
+                "response_time_min": None,
+                "response_time_max": None,
+            }
+        entry["total"] += 1
+        status_code = row.get("status_code")
+        if status_code is not None and 200 <= status_code < 400:
+            entry["successful"] += 1
+        response_time = row.get("response_time")
+        if response_time is not None:
+            entry["response_time_sum"] += response_time
+            entry["response_time_count"] += 1
+            if entry["response_time_min"] is None or response_time < entry["response_time_min"]:
+                entry["response_time_min"] = response_time
+            if entry["response_time_max"] is None or response_time > entry["response_time_max"]:
+                entry["response_time_max"] = response_time
+    return [stats[key] for key in sorted(stats)]
+
+
+class GatewayLogWriter:
+    """Buffers gateway log rows in memory and inserts them in batches
+
+    Request handlers call `enqueue`, which never awaits or touches the
+    database. A background task collects up to `batch_size` rows (waiting
+    at most `flush_interval` seconds for a batch to fill) and writes each
+    batch with a single COPY. When the queue is full, rows are
+    dropped and counted rather than slowing down requests.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        # Drop count already reported in the log
+        self._reported_dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        # Rows taken off the queue but not yet handed to a write
+        self._batch: List[Dict[str, Any]] = []
+        self._writing: Optional[asyncio.Future] = None
+
+    def enqueue(self, **fields: Any) -> bool:
+        """Queue one gateway_logs row
+
+        Args:
+            **fields: GatewayLog column values
+
+        Returns:
+            False if the row was dropped because the queue is full
+        """
+        fields.setdefault("created_at", datetime.utcnow())
+        try:
+            self._queue.put_nowait(fields)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write out everything still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._writing is not None:
+            # The in-flight batch is shielded from cancellation
+            await self._writing
+            self._writing = None
+        if self._batch:
+            batch, self._batch = self._batch, []
+            await self._write(batch)
+        while not self._queue.empty():
+            await self._write(self._drain(self.batch_size))
+
+    async def _run(self):
+        while True:
+            self._batch.append(await self._queue.get())
+            if self._queue.qsize() < self.batch_size - 1:
+                # Let a batch accumulate under light load
+                await asyncio.sleep(self.flush_interval)
+            self._batch.extend(self._drain(self.batch_size - 1))
+            batch, self._batch = self._batch, []
+            self._writing = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._writing)
+            self._writing = None
+            self._report_dropped()
+
+    def _report_dropped(self):
+        """Log rows dropped on a full queue since the last report
+        
+        Called once per flush, so a sustained overload produces one warning
+        per batch rather than one per request.
+        """
+        if self.dropped > self._reported_dropped:
+            logger.warning(
+                f"Gateway log queue full: dropped {self.dropped - self._reported_dropped} rows "
+                f"({self.dropped} total)"
+            )
+            self._reported_dropped = self.dropped
+    
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to `limit` queued rows without waiting"""
+        rows = []
+        while len(rows) < limit and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _write(self, rows: List[Dict[str, Any]]):
+        """Copy a batch of rows into gateway_logs in one binary COPY
+
+        Uses asyncpg's COPY protocol directly rather than the ORM, so a batch
+        is a single streamed statement with no per-row parse/plan. The
+        batch's per-minute stats are upserted in the same transaction.
+        """
+        records = _copy_records(rows)
+        stats = _minute_stats(rows)
+        try:
+            async with engine.begin() as conn:
+                # The upsert opens the transaction the COPY then joins
+                await conn.execute(_STATS_UPSERT, stats)
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    GatewayLog.__tablename__,
+                    records=records,
+                    columns=_COPY_COLUMNS,
+                )
+        except Exception as e:
+            logger.warning(f"Dropped {len(rows)} gateway log rows: {e}")
+
+
+# Global writer shared by the logging middleware; started in the app lifespan
+gateway_log_writer = GatewayLogWriter(
+    max_queue=settings.LOG_QUEUE_SIZE,
+    batch_size=settings.LOG_BATCH_SIZE,
+    flush_interval=settings.LOG_FLUSH_INTERVAL,
+)
@@ -1,11 +1,13 @@
 """Logging Service - Request/response logging and analytics"""
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import Float, select, func, and_, tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, array
 
 from app.models.gateway_log import GatewayLog
+from app.models.gateway_log_stats import GatewayLogMinuteStats as MinuteStats
 from app.schemas.gateway_log import GatewayLogCreate, GatewayLogFilter
 from app.schemas.gateway_stats import (
     GatewayStatsResponse,
@@ -14,6 +16,33 @@ from app.schemas.gateway_stats import (
     PerformanceMetrics
 )
 
+# Columns returned by the log listing endpoints (fields of GatewayLogResponse);
+# client_ip is rendered as text by the database
+_LOG_COLUMNS = (
+    GatewayLog.id,
+    GatewayLog.request_id,
+    GatewayLog.method,
+    GatewayLog.path,
+    GatewayLog.target_service,
+    GatewayLog.user_id,
+    func.host(GatewayLog.client_ip).label("client_ip"),
+    GatewayLog.status_code,
+    GatewayLog.response_time,
+    GatewayLog.error_message,
+    GatewayLog.created_at,
+)
+
+# Aggregates over per-minute rollup rows; the average is weighted by the
+# number of timed requests in each row
+_TOTAL = func.sum(MinuteStats.total)
+_SUCCESSFUL = func.sum(MinuteStats.successful)
+_AVG_TIME = func.sum(MinuteStats.response_time_sum) / type_coerce(
+    func.nullif(func.sum(MinuteStats.response_time_count), 0), Float
+)
+
+# Response time percentiles reported by get_performance_metrics
+_PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
 
 class LoggingService:
     """Service for logging and analytics"""
@@ -21,67 +50,32 @@ class LoggingService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def log_request(
-        self,
-        request_id: UUID,
-        method: str,
-        path: str,
-        target_service: Optional[str] = None,
-        user_id: Optional[UUID] = None,
-        client_ip: Optional[str] = None,
-        status_code: Optional[int] = None,
-        response_time: Optional[float] = None,
-        error_message: Optional[str] = None
-    ) -> GatewayLog:
-        """Log a gateway request
-        
-        Args:
-            request_id: Unique request ID
-            method: HTTP method
-            path: Request path
-            target_service: Target service name
-            user_id: User ID (if authenticated)
-            client_ip: Client IP address
-            status_code: Response status code
-            response_time: Response time in milliseconds
-            error_message: Error message (if any)
-            
-        Returns:
-            Created GatewayLog
-        """
-        log = GatewayLog(
-            request_id=request_id,
-            method=method,
-            path=path,
-            target_service=target_service,
-            user_id=user_id,
-            client_ip=client_ip,
-            status_code=status_code,
-            response_time=response_time,
-            error_message=error_message
-        )
-        self.db.add(log)
-        await self.db.commit()
-        await self.db.refresh(log)
-        return log
-    
     async def get_logs(
         self,
         filters: Optional[GatewayLogFilter] = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> List[GatewayLog]:
-        """Get gateway logs with optional filters
+        before: Optional[datetime] = None,
+        before_id: Optional[UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """Get gateway logs with optional filters, newest first
+        
+        Uses keyset pagination: pass the `created_at` and `id` of the last
+        log of a page as `before` and `before_id` to get the next one, which
+        is an index seek on created_at instead of scanning and discarding
+        `offset` rows. The id breaks ties between logs written with the same
+        timestamp (common for batched inserts), so none are skipped.
         
         Args:
             filters: Log filters
             limit: Maximum number of logs to return
-            offset: Number of logs to skip
+            before: Only return logs created before this time
+            before_id: ID of the last log of the previous page; logs created
+                exactly at `before` are returned if their ID sorts below it
             
         Returns:
-            List of GatewayLog
+            List of log rows as plain dicts (no ORM objects)
         """
-        stmt = select(GatewayLog)
+        stmt = select(*_LOG_COLUMNS)
         
         if filters:
             if filters.method:
@@ -103,26 +97,31 @@ class LoggingService:
             if filters.max_response_time:
                 stmt = stmt.where(GatewayLog.response_time <= filters.max_response_time)
         
-        stmt = stmt.order_by(GatewayLog.created_at.desc()).limit(limit).offset(offset)
+        if before and before_id:
+            stmt = stmt.where(tuple_(GatewayLog.created_at, GatewayLog.id) < (before, before_id))
+        elif before:
+            stmt = stmt.where(GatewayLog.created_at < before)
+        
+        stmt = stmt.order_by(GatewayLog.created_at.desc(), GatewayLog.id.desc()).limit(limit)
         
         result = await self.db.execute(stmt)
-        return result.scalars().all()
+        return [dict(row) for row in result.mappings()]
     
-    async def get_error_logs(self, limit: int = 100) -> List[GatewayLog]:
+    async def get_error_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent error logs
         
         Args:
             limit: Maximum number of logs to return
             
         Returns:
-            List of error GatewayLog
+            List of error log rows as plain dicts
         """
-        stmt = select(GatewayLog).where(
+        stmt = select(*_LOG_COLUMNS).where(
             GatewayLog.error_message.isnot(None)
         ).order_by(GatewayLog.created_at.desc()).limit(limit)
         
         result = await self.db.execute(stmt)
-        return result.scalars().all()
+        return [dict(row) for row in result.mappings()]
     
     async def get_gateway_stats(self, hours: int = 24) -> GatewayStatsResponse:
         """Get gateway statistics for a time period
@@ -133,39 +132,26 @@ class LoggingService:
         Returns:
             Gateway statistics
         """
-        start_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        # Total requests
-        total_stmt = select(func.count(GatewayLog.id)).where(
-            GatewayLog.created_at >= start_time
-        )
-        total_result = await self.db.execute(total_stmt)
-        total_requests = total_result.scalar() or 0
+        # Statistics read the per-minute rollup (a few rows per minute)
+        # rather than every logged request
+        start_time = (datetime.utcnow() - timedelta(hours=hours)).replace(second=0, microsecond=0)
         
-        # Successful requests (2xx, 3xx)
-        success_stmt = select(func.count(GatewayLog.id)).where(
-            and_(
-                GatewayLog.created_at >= start_time,
-                GatewayLog.status_code >= 200,
-                GatewayLog.status_code < 400
-            )
+        # Totals, successes (2xx, 3xx) and average response time
+        totals_stmt = select(
+            _TOTAL.label('total'),
+            _SUCCESSFUL.label('successful'),
+            _AVG_TIME.label('avg_time')
+        ).where(
+            MinuteStats.minute >= start_time
         )
-        success_result = await self.db.execute(success_stmt)
-        successful_requests = success_result.scalar() or 0
+        totals = (await self.db.execute(totals_stmt)).one()
+        total_requests = totals.total or 0
+        successful_requests = totals.successful or 0
+        avg_response_time = totals.avg_time or 0
         
         failed_requests = total_requests - successful_requests
         error_rate = (failed_requests / total_requests * 100) if total_requests > 0 else 0
         
-        # Average response time
-        avg_time_stmt = select(func.avg(GatewayLog.response_time)).where(
-            and_(
-                GatewayLog.created_at >= start_time,
-                GatewayLog.response_time.isnot(None)
-            )
-        )
-        avg_time_result = await self.db.execute(avg_time_stmt)
-        avg_response_time = avg_time_result.scalar() or 0
-        
         # Requests per second
         time_diff = hours * 3600  # Convert to seconds
         requests_per_second = total_requests / time_diff if time_diff > 0 else 0
@@ -190,40 +176,28 @@ class LoggingService:
         )
     
     async def _get_top_endpoints(self, start_time: datetime, limit: int = 10) -> List[EndpointStats]:
-        """Get top endpoints by traffic"""
-        # This is a simplified version - in production, use more complex aggregations
+        """Get top endpoints by traffic (one aggregation query)"""
         stmt = select(
-            GatewayLog.path,
-            func.count(GatewayLog.id).label('total'),
-            func.avg(GatewayLog.response_time).label('avg_time'),
-            func.min(GatewayLog.response_time).label('min_time'),
-            func.max(GatewayLog.response_time).label('max_time')
+            MinuteStats.path,
+            _TOTAL.label('total'),
+            _SUCCESSFUL.label('successful'),
+            _AVG_TIME.label('avg_time'),
+            func.min(MinuteStats.response_time_min).label('min_time'),
+            func.max(MinuteStats.response_time_max).label('max_time')
         ).where(
-            GatewayLog.created_at >= start_time
-        ).group_by(GatewayLog.path).order_by(func.count(GatewayLog.id).desc()).limit(limit)
+            MinuteStats.minute >= start_time
+        ).group_by(MinuteStats.path).order_by(_TOTAL.desc()).limit(limit)
         
         result = await self.db.execute(stmt)
         rows = result.all()
         
         endpoints = []
         for row in rows:
-            # Count successful vs failed
-            success_stmt = select(func.count(GatewayLog.id)).where(
-                and_(
-                    GatewayLog.path == row.path,
-                    GatewayLog.created_at >= start_time,
-                    GatewayLog.status_code >= 200,
-                    GatewayLog.status_code < 400
-                )
-            )
-            success_result = await self.db.execute(success_stmt)
-            successful = success_result.scalar() or 0
-            
             endpoints.append(EndpointStats(
                 path=row.path,
                 total_requests=row.total,
-                successful_requests=successful,
-                failed_requests=row.total - successful,
+                successful_requests=row.successful,
+                failed_requests=row.total - row.successful,
                 avg_response_time=row.avg_time or 0,
                 min_response_time=row.min_time or 0,
                 max_response_time=row.max_time or 0
@@ -232,35 +206,25 @@ class LoggingService:
         return endpoints
     
     async def _get_service_stats(self, start_time: datetime) -> List[ServiceStats]:
-        """Get statistics per service"""
+        """Get statistics per service (one aggregation query)"""
         stmt = select(
-            GatewayLog.target_service,
-            func.count(GatewayLog.id).label('total'),
-            func.avg(GatewayLog.response_time).label('avg_time')
+            MinuteStats.target_service,
+            _TOTAL.label('total'),
+            _SUCCESSFUL.label('successful'),
+            _AVG_TIME.label('avg_time')
         ).where(
             and_(
-                GatewayLog.created_at >= start_time,
-                GatewayLog.target_service.isnot(None)
+                MinuteStats.minute >= start_time,
+                MinuteStats.target_service != ''
             )
-        ).group_by(GatewayLog.target_service)
+        ).group_by(MinuteStats.target_service)
         
         result = await self.db.execute(stmt)
         rows = result.all()
         
         services = []
         for row in rows:
-            # Count successful vs failed
-            success_stmt = select(func.count(GatewayLog.id)).where(
-                and_(
-                    GatewayLog.target_service == row.target_service,
-                    GatewayLog.created_at >= start_time,
-                    GatewayLog.status_code >= 200,
-                    GatewayLog.status_code < 400
-                )
-            )
-            success_result = await self.db.execute(success_stmt)
-            successful = success_result.scalar() or 0
-            
+            successful = row.successful
             failed = row.total - successful
             error_rate = (failed / row.total * 100) if row.total > 0 else 0
             
@@ -286,18 +250,27 @@ class LoggingService:
         """
         start_time = datetime.utcnow() - timedelta(hours=hours)
         
-        # Get all response times
-        stmt = select(GatewayLog.response_time).where(
+        # Percentiles are computed by the database in one aggregate (one
+        # sort for all four) instead of fetching every response time
+        stmt = select(
+            type_coerce(
+                func.percentile_cont(array(_PERCENTILES)).within_group(
+                    GatewayLog.response_time
+                ),
+                ARRAY(Float)
+            ).label('percentiles'),
+            func.count().label('total')
+        ).where(
             and_(
                 GatewayLog.created_at >= start_time,
                 GatewayLog.response_time.isnot(None)
             )
-        ).order_by(GatewayLog.response_time)
+        )
         
         result = await self.db.execute(stmt)
-        response_times = [row[0] for row in result.all()]
+        row = result.one()
         
-        if not response_times:
+        if not row.total:
             return PerformanceMetrics(
                 p50_response_time=0,
                 p90_response_time=0,
@@ -307,18 +280,12 @@ class LoggingService:
                 time_period=f"Last {hours} hours"
             )
         
-        # Calculate percentiles
-        total = len(response_times)
-        p50_idx = int(total * 0.50)
-        p90_idx = int(total * 0.90)
-        p95_idx = int(total * 0.95)
-        p99_idx = int(total * 0.99)
-        
+        p50, p90, p95, p99 = row.percentiles
         return PerformanceMetrics(
-            p50_response_time=response_times[p50_idx] if p50_idx < total else response_times[-1],
-            p90_response_time=response_times[p90_idx] if p90_idx < total else response_times[-1],
-            p95_response_time=response_times[p95_idx] if p95_idx < total else response_times[-1],
-            p99_response_time=response_times[p99_idx] if p99_idx < total else response_times[-1],
-            total_requests=total,
+            p50_response_time=p50,
+            p90_response_time=p90,
+            p95_response_time=p95,
+            p99_response_time=p99,
+            total_requests=row.total,
             time_period=f"Last {hours} hours"
         )
@@ -1,110 +1,228 @@
 """Proxy Service - Forward requests to target services"""
 import asyncio
+import random
 import time
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 import httpx
 from uuid import UUID
 
+from app.core.config import settings
 from app.schemas.proxy import ProxyRequest, ProxyResponse, GatewayError
 
+# Connection-level headers that must not be relayed (RFC 7230, section 6.1)
+_HOP_BY_HOP_HEADERS = frozenset({
+    'connection',
+    'keep-alive',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'te',
+    'trailer',
+    'transfer-encoding',
+    'upgrade',
+})
+
+# Raw (lowercase bytes) request headers dropped before forwarding. Host is
+# set by the upstream URL and the gateway's own headers are re-added, so
+# clients cannot spoof them.
+_STRIPPED_REQUEST_HEADERS = frozenset(
+    name.encode('latin-1') for name in _HOP_BY_HOP_HEADERS
+) | frozenset({b'host', b'x-user-id', b'x-request-id', b'x-forwarded-by'})
+
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff before retrying a failed attempt (0-based)
+    
+    Exponential, capped at 5 seconds, with up to 100ms of jitter so that
+    requests which failed together don't all retry at the same moment.
+    """
+    return min(0.1 * 2 ** attempt, 5.0) + random.random() * 0.1
+
+
+def _build_target_url(target_url: str, path: str, query_string: bytes) -> str:
+    """Build the upstream URL; the raw query string is passed through as is
+    
+    Args:
+        target_url: Target service base URL
+        path: Request path
+        query_string: Raw query string, without the leading "?"
+        
+    Returns:
+        Full upstream URL
+    """
+    full_url = f"{target_url.rstrip('/')}{path}"
+    if query_string:
+        full_url = f"{full_url}?{query_string.decode('latin-1')}"
+    return full_url
+
+
+def _forward_headers(
+    headers: List[Tuple[bytes, bytes]],
+    user_id: Optional[UUID],
+    request_id: Optional[str]
+) -> List[Tuple[bytes, bytes]]:
+    """Build the upstream request headers from the raw client headers
+    
+    Hop-by-hop and gateway-owned headers are dropped in one pass against a
+    precomputed set; headers named in Connection are hop-by-hop too (RFC
+    7230 6.1). Host is left to the upstream URL.
+    
+    Args:
+        headers: Raw request headers, as (name, value) byte pairs
+        user_id: Authenticated user ID
+        request_id: Request tracking ID (already formatted)
+        
+    Returns:
+        Raw headers to send upstream
+    """
+    stripped = _STRIPPED_REQUEST_HEADERS
+    for name, value in headers:
+        if name == b'connection':
+            stripped = stripped | {token.strip().lower() for token in value.split(b',')}
+    forward_headers = [
+        (name, value) for name, value in headers
+        if name not in stripped
+    ]
+    if user_id:
+        forward_headers.append((b'x-user-id', str(user_id).encode('latin-1')))
+    if request_id:
+        forward_headers.append((b'x-request-id', request_id.encode('latin-1')))
+    forward_headers.append((b'x-forwarded-by', b'Mission-Engadi-Gateway'))
+    return forward_headers
+
 
 class ProxyService:
     """Service for proxying requests to downstream services"""
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # One pooled client per upstream host (scheme://host:port), so a busy
+        # service can't take the connections or keepalive slots of the others
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # Same clients keyed by the target URLs seen, to skip URL parsing
+        self._clients_by_url: Dict[str, httpx.AsyncClient] = {}
+    
+    @staticmethod
+    def _new_client() -> httpx.AsyncClient:
+        """Create a pooled client for one upstream host
+        
+        The pool is sized above httpx's defaults (100 connections, 20 kept
+        alive) so bursts don't queue for a connection, and HTTP/2 multiplexes
+        requests to TLS upstreams. Retries stay in stream_request's own loop
+        (the transport doesn't retry).
+        """
+        return httpx.AsyncClient(
+            timeout=settings.GATEWAY_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=0,
+                limits=httpx.Limits(
+                    max_connections=settings.GATEWAY_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GATEWAY_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=60.0,
+                ),
+            ),
+        )
+    
+    def _get_client(self, url: str) -> httpx.AsyncClient:
+        """Get the client for the upstream host of `url`, creating it on first use"""
+        client = self._clients_by_url.get(url)
+        if client is None:
+            parts = urlsplit(url)
+            origin = f"{parts.scheme}://{parts.netloc}"
+            client = self._clients.get(origin)
+            if client is None:
+                client = self._clients[origin] = self._new_client()
+            self._clients_by_url[url] = client
+        return client
     
-    async def forward_request(
+    async def stream_request(
         self,
         target_url: str,
+        target_service: str,
         method: str,
         path: str,
-        headers: Dict[str, str],
-        query_params: Optional[Dict[str, Any]] = None,
-        body: Optional[Any] = None,
+        headers: List[Tuple[bytes, bytes]],
+        query_string: bytes = b"",
+        body: Optional[bytes] = None,
         user_id: Optional[UUID] = None,
-        request_id: Optional[UUID] = None,
+        request_id: Optional[str] = None,
         timeout: int = 30,
         retry_count: int = 3
     ) -> ProxyResponse:
-        """Forward request to target service
+        """Forward request to target service and stream the response back
+        
+        The upstream body is not buffered: the returned ProxyResponse.body is
+        an async iterator of raw chunks which closes the upstream response
+        once consumed. Retries only apply until response headers arrive.
         
         Args:
             target_url: Target service base URL
+            target_service: Target service name, as configured on the route
             method: HTTP method
             path: Request path
-            headers: Request headers
-            query_params: Query parameters
-            body: Request body
+            headers: Raw request headers, as (name, value) byte pairs
+            query_string: Raw query string, without the leading "?"
+            body: Raw request body
             user_id: Authenticated user ID
-            request_id: Request tracking ID
+            request_id: Request tracking ID (already formatted)
             timeout: Request timeout in seconds
             retry_count: Number of retry attempts
             
         Returns:
-            ProxyResponse
+            ProxyResponse with a streaming body
             
         Raises:
             httpx.HTTPError: On request failure
         """
-        # Build full URL
-        full_url = f"{target_url.rstrip('/')}{path}"
-        
-        # Add custom headers
-        forward_headers = headers.copy()
-        if user_id:
-            forward_headers['X-User-ID'] = str(user_id)
-        if request_id:
-            forward_headers['X-Request-ID'] = str(request_id)
-        forward_headers['X-Forwarded-By'] = 'Mission-Engadi-Gateway'
-        
-        # Remove host header to avoid conflicts
-        forward_headers.pop('host', None)
-        forward_headers.pop('Host', None)
+        full_url = _build_target_url(target_url, path, query_string)
+        forward_headers = _forward_headers(headers, user_id, request_id)
         
-        start_time = time.time()
+        client = self._get_client(target_url)
+        start_ns = time.perf_counter_ns()
         
         # Retry logic
-        last_exception = None
         for attempt in range(retry_count):
             try:
-                response = await self.client.request(
+                request = client.build_request(
                     method=method,
                     url=full_url,
                     headers=forward_headers,
-                    params=query_params,
-                    json=body if body else None,
+                    content=body or None,
                     timeout=timeout
                 )
+                response = await client.send(request, stream=True)
                 
-                response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-                
-                # Extract service name from URL
-                target_service = target_url.split('//')[-1].split(':')[0]
+                # Time to response headers, in milliseconds
+                response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
                 
                 return ProxyResponse(
                     status_code=response.status_code,
-                    headers=dict(response.headers),
-                    body=response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text,
+                    headers={
+                        key: value for key, value in response.headers.items()
+                        if key not in _HOP_BY_HOP_HEADERS
+                    },
+                    body=self._iter_body(response),
                     response_time=response_time,
                     target_service=target_service
                 )
                 
-            except httpx.TimeoutException as e:
-                last_exception = e
-                if attempt < retry_count - 1:
-                    await asyncio.sleep(0.5 * (attempt + 1))  # Exponential backoff
-                continue
-                
-            except httpx.HTTPError as e:
-                last_exception = e
-                if attempt < retry_count - 1:
-                    await asyncio.sleep(0.5 * (attempt + 1))
-                continue
+            except httpx.HTTPError:  # Includes timeouts
+                # Out of attempts: fail now rather than after one more backoff
+                if attempt >= retry_count - 1:
+                    raise
+                await asyncio.sleep(_retry_delay(attempt))
         
-        # All retries failed
-        response_time = (time.time() - start_time) * 1000
-        raise last_exception
+        raise ValueError("retry_count must be at least 1")
+    
+    @staticmethod
+    async def _iter_body(response: httpx.Response) -> AsyncIterator[bytes]:
+        """Yield raw upstream body chunks, closing the response when done"""
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        finally:
+            await response.aclose()
     
     async def health_check(self, service_url: str, timeout: int = 5) -> tuple[bool, float]:
         """Check health of a service
@@ -116,19 +234,52 @@ class ProxyService:
         Returns:
             Tuple of (is_healthy, response_time_ms)
         """
+        start_ns = time.perf_counter_ns()
         try:
-            start_time = time.time()
             health_url = f"{service_url.rstrip('/')}/health"
             
-            response = await self.client.get(health_url, timeout=timeout)
-            response_time = (time.time() - start_time) * 1000
+            response = await self._get_client(service_url).get(health_url, timeout=timeout)
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             return response.status_code == 200, response_time
             
         except Exception:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             return False, response_time
     
+    async def health_check_many(
+        self,
+        service_urls: List[str],
+        timeout: int = 5
+    ) -> List[Tuple[bool, float]]:
+        """Check health of several services concurrently
+        
+        The checks run together, so this takes as long as the slowest service
+        rather than the sum of all of them.
+        
+        Args:
+            service_urls: Service URLs
+            timeout: Health check timeout, per service
+            
+        Returns:
+            List of (is_healthy, response_time_ms) tuples, in the order of
+            service_urls
+        """
+        return list(await asyncio.gather(*(
+            self.health_check(service_url, timeout=timeout)
+            for service_url in service_urls
+        )))
+    
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Close all upstream HTTP clients"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._clients_by_url.clear()
+        for client in clients:
+            await client.aclose()
+
+
+@lru_cache
+def get_proxy_service() -> ProxyService:
+    """Get the shared proxy service instance"""
+    return ProxyService()
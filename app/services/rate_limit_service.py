@@ -1,21 +1,135 @@
 """Rate Limit Service - Rate limiting logic"""
+import logging
+import math
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, List, Tuple
+from cachetools import LRUCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
+from redis.exceptions import RedisError
 from uuid import UUID
 
+from app.core.config import settings
+from app.db.redis import redis_client
+from app.db.session import AsyncSessionLocal, get_request_session
 from app.models.rate_limit_rule import RateLimitRule, LimitType
 from app.schemas.rate_limit_rule import RateLimitRuleCreate, RateLimitRuleUpdate, RateLimitStatus
+from app.services.cache_invalidation import (
+    VersionedTTLCache,
+    listen_for_invalidations,
+    publish_invalidation,
+)
+
+logger = logging.getLogger(__name__)
+
+# Atomic token buckets for all rules applying to a request: refill each for
+# the time elapsed, then take a token from every bucket if each has one left,
+# or from none. A full bucket holds max_requests tokens and refills at
+# max_requests per window, so bursts up to the limit are allowed without the
+# double burst a fixed window admits at its edges. State is two numbers per
+# key, which expires once the bucket would be full again.
+# KEYS = bucket keys; ARGV = now_ms, then max_requests, window_ms per key
+# Returns {allowed, current_requests, reset_ms} per key: reset_ms is the time
+# until a token is available when empty, else until the bucket is full
+LUA_TOKEN_BUCKET = """
+local now = tonumber(ARGV[1])
+local buckets = {}
+local admit = true
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = capacity / tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    if tokens == nil then
+        tokens = capacity
+    else
+        tokens = math.min(capacity, tokens + math.max(now - tonumber(state[2]), 0) * rate)
+    end
+    if tokens < 1 then
+        admit = false
+    end
+    buckets[i] = {capacity, rate, tokens}
+end
+
+local results = {}
+for i, key in ipairs(KEYS) do
+    local capacity, rate, tokens = buckets[i][1], buckets[i][2], buckets[i][3]
+    local allowed = 1
+    local reset
+    if tokens < 1 then
+        allowed = 0
+        reset = math.ceil((1 - tokens) / rate)
+    else
+        if admit then
+            tokens = tokens - 1
+        end
+        reset = math.ceil((capacity - tokens) / rate)
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate) + 1)
+    results[i] = {allowed, capacity - math.floor(tokens), reset}
+end
+return results
+"""
+
+# Run by SHA (EVALSHA); redis-py loads the script on a NOSCRIPT error
+_token_bucket_script = redis_client.register_script(LUA_TOKEN_BUCKET)
+
+
+class RateLimitRulesCache(VersionedTTLCache[List[RateLimitRule]]):
+    """Process-wide cache of active rate limit rules
+    
+    Rules are reloaded from the database after `ttl` seconds or when
+    invalidated by rule CRUD on any gateway instance (via Redis pub/sub).
+    """
+    
+    def __init__(self, ttl: int):
+        super().__init__(ttl)
+        # (path prefix, rule) pairs, "" for rules applying to every path;
+        # read once here instead of through the ORM attributes per request
+        self._prefixes: List[Tuple[str, RateLimitRule]] = []
+    
+    def set(self, rules: List[RateLimitRule], version: int) -> bool:
+        """Store freshly loaded rules unless they changed while loading"""
+        if not super().set(rules, version):
+            return False
+        self._prefixes = [(rule.path_pattern or "", rule) for rule in rules]
+        return True
+    
+    def applicable(self, path: str) -> Optional[List[RateLimitRule]]:
+        """Get the cached rules applying to a path if they are still fresh"""
+        if self.get() is None:
+            return None
+        return [rule for prefix, rule in self._prefixes if path.startswith(prefix)]
+
+
+# Global rules cache shared by all RateLimitService instances
+rate_limit_rules_cache = RateLimitRulesCache(ttl=settings.RATE_LIMIT_RULES_CACHE_TTL)
+
+# In-memory token buckets, used only while Redis is unreachable:
+# key -> [tokens, last_refill (monotonic seconds)]. Bounded so an outage
+# doesn't grow it with every client seen; an evicted bucket starts again
+# full, as it would after being left idle
+_local_buckets: LRUCache = LRUCache(maxsize=settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
+async def publish_rules_changed():
+    """Tell every gateway instance to drop its cached rate limit rules"""
+    await publish_invalidation(settings.RATE_LIMIT_INVALIDATION_CHANNEL)
+
+
+async def listen_for_rule_changes():
+    """Invalidate the local rules cache on pub/sub notifications"""
+    await listen_for_invalidations(settings.RATE_LIMIT_INVALIDATION_CHANNEL, rate_limit_rules_cache)
 
 
 class RateLimitService:
     """Service for rate limiting"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: Optional[AsyncSession] = None):
+        # Without a session, one is opened only when rules must be reloaded
         self.db = db
-        # In-memory cache for rate limiting (use Redis in production)
-        self._rate_limit_cache: Dict[str, Dict] = {}
     
     async def check_rate_limit(
         self,
@@ -35,35 +149,60 @@ class RateLimitService:
         """
         # Get applicable rate limit rules
         rules = await self._get_applicable_rules(path)
+        if not rules:
+            return True, None
         
-        for rule in rules:
-            # Determine key based on limit type
-            key = self._get_rate_limit_key(rule, user_id, client_ip, path)
-            
-            # Check limit
-            is_allowed, status = self._check_limit(key, rule)
-            
+        # Determine keys based on limit type, then check all limits at once
+        keys = [self._get_rate_limit_key(rule, user_id, client_ip, path) for rule in rules]
+        results = await self._check_limits(keys, rules)
+        
+        tightest = None
+        for key, rule, (is_allowed, current_count, reset_ms) in zip(keys, rules, results):
             if not is_allowed:
-                return False, status
+                return False, self._build_status(key, rule, current_count, reset_ms)
+            
+            # Report the rule closest to its limit; only its status is built
+            remaining = rule.max_requests - current_count
+            if tightest is None or remaining < tightest[0]:
+                tightest = (remaining, key, rule, current_count, reset_ms)
         
-        return True, None
+        return True, self._build_status(*tightest[1:])
+    
+    async def get_active_rules(self) -> List[RateLimitRule]:
+        """Get active rate limit rules, from cache when fresh"""
+        rules = rate_limit_rules_cache.get()
+        if rules is not None:
+            return rules
+        
+        async with rate_limit_rules_cache.lock:
+            # Another request may have reloaded them while we waited
+            rules = rate_limit_rules_cache.get()
+            if rules is None:
+                version = rate_limit_rules_cache.version
+                stmt = select(RateLimitRule).where(RateLimitRule.is_active == True)
+                db = self.db if self.db is not None else get_request_session()
+                if db is not None:
+                    result = await db.execute(stmt)
+                else:
+                    async with AsyncSessionLocal() as db:
+                        result = await db.execute(stmt)
+                rules = list(result.scalars().all())
+                rate_limit_rules_cache.set(rules, version)
+        
+        return rules
     
     async def _get_applicable_rules(self, path: str) -> list[RateLimitRule]:
         """Get rate limit rules applicable to a path"""
-        stmt = select(RateLimitRule).where(
-            RateLimitRule.is_active == True
-        )
-        
-        result = await self.db.execute(stmt)
-        rules = result.scalars().all()
+        applicable = rate_limit_rules_cache.applicable(path)
+        if applicable is not None:
+            return applicable
         
         # Filter rules that match the path
-        applicable = []
-        for rule in rules:
-            if rule.path_pattern is None or path.startswith(rule.path_pattern):
-                applicable.append(rule)
-        
-        return applicable
+        rules = await self.get_active_rules()
+        return [
+            rule for rule in rules
+            if rule.path_pattern is None or path.startswith(rule.path_pattern)
+        ]
     
     def _get_rate_limit_key(
         self,
@@ -82,55 +221,96 @@ class RateLimitService:
         else:  # GLOBAL
             return f"global:{rule.id}"
     
-    def _check_limit(self, key: str, rule: RateLimitRule) -> tuple[bool, Optional[RateLimitStatus]]:
-        """Check if key is within rate limit"""
-        now = datetime.utcnow()
-        
-        # Initialize or get existing cache entry
-        if key not in self._rate_limit_cache:
-            self._rate_limit_cache[key] = {
-                'count': 0,
-                'window_start': now
-            }
-        
-        cache_entry = self._rate_limit_cache[key]
-        
-        # Check if window has expired
-        window_end = cache_entry['window_start'] + timedelta(seconds=rule.window_seconds)
-        if now > window_end:
-            # Reset window
-            cache_entry['count'] = 0
-            cache_entry['window_start'] = now
-        
-        # Check limit
-        current_count = cache_entry['count']
-        if current_count >= rule.max_requests:
-            # Limit exceeded
-            status = RateLimitStatus(
-                key=key,
-                limit_type=rule.limit_type,
-                current_requests=current_count,
-                max_requests=rule.max_requests,
-                window_seconds=rule.window_seconds,
-                remaining=0,
-                reset_at=window_end
-            )
-            return False, status
+    async def _check_limits(
+        self,
+        keys: List[str],
+        rules: List[RateLimitRule]
+    ) -> List[Tuple[bool, int, int]]:
+        """Check each key against its rule
         
-        # Increment count
-        cache_entry['count'] += 1
+        Uses atomic Redis token buckets, falling back to in-memory buckets
+        on this instance while Redis is unavailable. The request takes a
+        token from every bucket, or from none if any rule rejects it.
         
-        status = RateLimitStatus(
+        Returns:
+            List of (is_allowed, current_count, reset_ms) tuples, one per key
+        """
+        try:
+            return await self._check_limits_redis(keys, rules)
+        except RedisError:
+            return self._check_limits_local(keys, rules)
+    
+    def _build_status(
+        self,
+        key: str,
+        rule: RateLimitRule,
+        current_count: int,
+        reset_ms: int
+    ) -> RateLimitStatus:
+        """Build the reported status; fields are trusted, so skip validation"""
+        return RateLimitStatus.model_construct(
             key=key,
             limit_type=rule.limit_type,
-            current_requests=cache_entry['count'],
+            current_requests=current_count,
             max_requests=rule.max_requests,
             window_seconds=rule.window_seconds,
-            remaining=rule.max_requests - cache_entry['count'],
-            reset_at=window_end
+            remaining=max(rule.max_requests - current_count, 0),
+            reset_at=datetime.utcnow() + timedelta(milliseconds=reset_ms)
         )
+    
+    async def _check_limits_redis(
+        self,
+        keys: List[str],
+        rules: List[RateLimitRule]
+    ) -> List[Tuple[bool, int, int]]:
+        """Run the token bucket script over all keys; one Redis round trip"""
+        args = [int(time.time() * 1000)]
+        for rule in rules:
+            args += (rule.max_requests, rule.window_seconds * 1000)
+        results = await _token_bucket_script(
+            keys=[f"ratelimit:{key}" for key in keys],
+            args=args,
+            client=redis_client
+        )
+        return [
+            (bool(allowed), int(current_count), int(reset_ms))
+            for allowed, current_count, reset_ms in results
+        ]
+    
+    def _check_limits_local(
+        self,
+        keys: List[str],
+        rules: List[RateLimitRule]
+    ) -> List[Tuple[bool, int, int]]:
+        """Token buckets in process memory, as LUA_TOKEN_BUCKET"""
+        now = time.monotonic()
+        
+        # Initialize or refill the buckets
+        buckets = []
+        for key, rule in zip(keys, rules):
+            bucket = _local_buckets.get(key)
+            if bucket is None:
+                bucket = _local_buckets[key] = [float(rule.max_requests), now]
+            else:
+                rate = rule.max_requests / rule.window_seconds
+                bucket[0] = min(rule.max_requests, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            buckets.append(bucket)
+        admit = all(bucket[0] >= 1 for bucket in buckets)
         
-        return True, status
+        results = []
+        for bucket, rule in zip(buckets, rules):
+            capacity = rule.max_requests
+            rate = capacity / rule.window_seconds  # Tokens per second
+            if bucket[0] < 1:
+                reset_ms = math.ceil((1 - bucket[0]) / rate * 1000)
+                results.append((False, capacity - int(bucket[0]), reset_ms))
+                continue
+            if admit:
+                bucket[0] -= 1  # Take a token
+            reset_ms = math.ceil((capacity - bucket[0]) / rate * 1000)
+            results.append((True, capacity - int(bucket[0]), reset_ms))
+        return results
     
     async def get_rate_limit_rules(self) -> list[RateLimitRule]:
         """Get all rate limit rules"""
@@ -142,35 +322,50 @@ class RateLimitService:
         """Create new rate limit rule"""
         rule = RateLimitRule(**rule_data.model_dump())
         self.db.add(rule)
+        # Defaults (id, timestamps) are set client-side, so nothing is read back
         await self.db.commit()
-        await self.db.refresh(rule)
+        await self._rules_changed()
         return rule
     
     async def update_rule(self, rule_id: str, rule_data: RateLimitRuleUpdate) -> Optional[RateLimitRule]:
         """Update rate limit rule"""
-        stmt = select(RateLimitRule).where(RateLimitRule.id == rule_id)
+        values = rule_data.model_dump(exclude_unset=True)
+        if not values:
+            stmt = select(RateLimitRule).where(RateLimitRule.id == rule_id)
+            result = await self.db.execute(stmt)
+            return result.scalar_one_or_none()
+        
+        # Update fields and read the row back in one statement
+        stmt = (
+            update(RateLimitRule)
+            .where(RateLimitRule.id == rule_id)
+            .values(**values)
+            .returning(RateLimitRule)
+            .execution_options(populate_existing=True)
+        )
         result = await self.db.execute(stmt)
         rule = result.scalar_one_or_none()
         
         if not rule:
             return None
         
-        for field, value in rule_data.model_dump(exclude_unset=True).items():
-            setattr(rule, field, value)
-        
         await self.db.commit()
-        await self.db.refresh(rule)
+        await self._rules_changed()
         return rule
     
     async def delete_rule(self, rule_id: str) -> bool:
         """Delete rate limit rule"""
-        stmt = select(RateLimitRule).where(RateLimitRule.id == rule_id)
+        # Delete and learn whether the row existed in one statement
+        stmt = delete(RateLimitRule).where(RateLimitRule.id == rule_id).returning(RateLimitRule.id)
         result = await self.db.execute(stmt)
-        rule = result.scalar_one_or_none()
-        
-        if not rule:
+        if result.scalar_one_or_none() is None:
             return False
         
-        await self.db.delete(rule)
         await self.db.commit()
+        await self._rules_changed()
         return True
+    
+    async def _rules_changed(self):
+        """Invalidate cached rules here and on every other instance"""
+        rate_limit_rules_cache.invalidate()
+        await publish_rules_changed()
@@ -0,0 +1,219 @@
+"""Route Trie - Segment-based route matching"""
+import re
+from fnmatch import translate
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from app.models.route_config import RouteConfig
+
+# Characters that make a segment a partial glob (e.g. "auth*", "v?", "[ab]")
+_GLOB_CHARS = frozenset("*?[")
+
+# Shared read-only child table for leaf nodes once the trie is finalized
+_NO_CHILDREN: Mapping[str, "RouteNode"] = MappingProxyType({})
+
+
+def _is_complex_segment(segment: str) -> bool:
+    """Check if a pattern segment needs regex matching"""
+    return segment != "*" and any(char in _GLOB_CHARS for char in segment)
+
+
+def _is_param_segment(segment: str) -> bool:
+    """Check if a pattern segment is a named parameter, e.g. "{user_id}" """
+    return len(segment) > 2 and segment[0] == "{" and segment[-1] == "}"
+
+
+class RouteNode:
+    """Trie node holding literal, parameter and glob children"""
+
+    __slots__ = ("children", "param_child", "glob_child", "methods", "literal_only", "terminal")
+
+    def __init__(self):
+        self.children: Mapping[str, "RouteNode"] = {}
+        self.param_child: Optional["RouteNode"] = None
+        self.glob_child: Optional["RouteNode"] = None
+        # Only literal children, so at most one branch can match (set by finalize)
+        self.literal_only = False
+        # Childless glob node that swallows the rest of the path (set by finalize)
+        self.terminal = False
+        # Upper-case HTTP method -> (rank, route) for patterns ending at this
+        # node, so method filtering is one dict lookup on an interned string
+        self.methods: Dict[str, Tuple[int, RouteConfig]] = {}
+
+
+class RouteTrie:
+    """Radix-style trie keyed on URL path segments
+
+    Patterns are split on "/" and each segment becomes a node:
+
+    - literal segments ("users") match exactly
+    - parameter segments ("{user_id}") match any single non-empty segment
+    - glob segments ("*") match one or more segments
+
+    Routes are ranked in insertion order, so callers insert them by
+    priority (highest first). When several patterns match a path, the
+    highest-ranked route wins, which preserves the previous linear-scan
+    semantics. Patterns with partial globs ("auth*") fall back to a
+    precompiled regex.
+
+    After loading, the trie is finalized: leaf nodes share one empty child
+    table and per-node flags are precomputed, so matching walks literal-only
+    prefixes ("/api/v1/...") in a loop and only recurses where parameter or
+    glob branches exist.
+    """
+
+    def __init__(self, routes: Iterable[RouteConfig] = ()):
+        self._root = RouteNode()
+        self._routes: List[RouteConfig] = []
+        self._fallback: List[Tuple[re.Pattern, FrozenSet[str], int, RouteConfig]] = []
+        self._finalized = False
+        for route in routes:
+            self.insert(route)
+        self.finalize()
+
+    @property
+    def routes(self) -> List[RouteConfig]:
+        """Routes in the trie, in rank order"""
+        return self._routes
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def insert(self, route: RouteConfig):
+        """Insert a route; later inserts rank below earlier ones
+
+        Args:
+            route: Route configuration to index
+        """
+        rank = len(self._routes)
+        self._routes.append(route)
+        self._finalized = False
+        methods = frozenset(method.upper() for method in route.methods)
+
+        segments = route.path_pattern.split("/")
+        if any(_is_complex_segment(segment) for segment in segments):
+            # Keep fnmatch semantics where "*" may span "/"
+            pattern = re.compile(translate(route.path_pattern))
+            self._fallback.append((pattern, methods, rank, route))
+            return
+
+        node = self._root
+        for segment in segments:
+            if segment == "*":
+                if node.glob_child is None:
+                    node.glob_child = RouteNode()
+                node = node.glob_child
+            elif _is_param_segment(segment):
+                if node.param_child is None:
+                    node.param_child = RouteNode()
+                node = node.param_child
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    if node.children is _NO_CHILDREN:
+                        node.children = {}
+                    child = node.children[segment] = RouteNode()
+                node = child
+
+        for method in methods:
+            node.methods.setdefault(method, (rank, route))
+
+    def finalize(self):
+        """Compact nodes and precompute matching flags
+
+        Called after bulk loading; match() calls it again if routes were
+        inserted since.
+        """
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if not node.children:
+                node.children = _NO_CHILDREN
+            node.literal_only = node.param_child is None and node.glob_child is None
+            node.terminal = not node.children and node.literal_only
+            stack.extend(node.children.values())
+            if node.param_child is not None:
+                stack.append(node.param_child)
+            if node.glob_child is not None:
+                stack.append(node.glob_child)
+        self._finalized = True
+
+    def match(self, path: str, method: str) -> Optional[RouteConfig]:
+        """Find the highest-ranked route matching a path and method
+
+        Args:
+            path: Request path
+            method: HTTP method
+
+        Returns:
+            Matched RouteConfig or None
+        """
+        if not self._finalized:
+            self.finalize()
+
+        segments = path.split("/")
+        count = len(segments)
+
+        # Walk literal-only nodes without recursing
+        node = self._root
+        index = 0
+        while index < count and node.literal_only:
+            node = node.children.get(segments[index])
+            if node is None:
+                break
+            index += 1
+
+        best = self._match_node(node, segments, index, method) if node is not None else None
+
+        for pattern, methods, rank, route in self._fallback:
+            if best is not None and rank > best[0]:
+                break
+            if method in methods and pattern.match(path):
+                best = (rank, route)
+                break
+
+        return best[1] if best else None
+
+    def _match_node(
+        self,
+        node: RouteNode,
+        segments: List[str],
+        index: int,
+        method: str
+    ) -> Optional[Tuple[int, RouteConfig]]:
+        """Depth-first walk preferring literal > param > glob children"""
+        if index == len(segments):
+            return node.methods.get(method)
+
+        best = None
+        segment = segments[index]
+
+        child = node.children.get(segment)
+        if child is not None:
+            best = self._match_node(child, segments, index + 1, method)
+
+        if node.param_child is not None and segment:
+            best = _better(best, self._match_node(node.param_child, segments, index + 1, method))
+
+        glob = node.glob_child
+        if glob is not None:
+            if glob.terminal:
+                # Trailing glob swallows the rest of the path
+                best = _better(best, glob.methods.get(method))
+            else:
+                for end in range(index + 1, len(segments) + 1):
+                    best = _better(best, self._match_node(glob, segments, end, method))
+
+        return best
+
+
+def _better(
+    current: Optional[Tuple[int, RouteConfig]],
+    candidate: Optional[Tuple[int, RouteConfig]]
+) -> Optional[Tuple[int, RouteConfig]]:
+    """Return the higher-ranked (lower rank number) of two matches"""
+    if candidate is None:
+        return current
+    if current is None or candidate[0] < current[0]:
+        return candidate
+    return current
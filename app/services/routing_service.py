@@ -1,11 +1,126 @@
 """Routing Service - Route matching and resolution"""
-from typing import Optional, List
+import logging
+from typing import AsyncIterator, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from fnmatch import fnmatch
+from sqlalchemy import delete, select, update
+from cachetools import TTLCache
 
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, get_request_session
 from app.models.route_config import RouteConfig
 from app.schemas.route_config import RouteConfigCreate, RouteConfigUpdate, RouteConfigResponse
+from app.services.cache_invalidation import (
+    VersionedTTLCache,
+    listen_for_invalidations,
+    publish_invalidation,
+)
+from app.services.route_trie import RouteTrie
+
+logger = logging.getLogger(__name__)
+
+
+class RouteTableCache(VersionedTTLCache[RouteTrie]):
+    """Process-wide cache of the compiled route trie
+    
+    The trie is rebuilt from the database when invalidated by route CRUD
+    or after `ttl` seconds, so other gateway replicas pick up changes.
+    Resolved (method, path) lookups are memoized on top of the trie.
+    """
+    
+    def __init__(self, ttl: int, lookup_size: int):
+        super().__init__(ttl)
+        self.lookups: TTLCache = TTLCache(maxsize=lookup_size, ttl=ttl)
+    
+    def set(self, trie: RouteTrie, version: int) -> bool:
+        """Store a freshly built trie unless routes changed while loading"""
+        previous = self._value
+        if not super().set(trie, version):
+            return False
+        if trie is not previous:
+            self.lookups.clear()
+        return True
+    
+    def invalidate(self):
+        """Drop the cached trie and lookups so the next request reloads them"""
+        super().invalidate()
+        self.lookups.clear()
+    
+    def lookup(self, path: str, method: str) -> Tuple[bool, Optional[RouteConfig]]:
+        """Resolve a route from memory only
+        
+        Returns:
+            Tuple of (hit, route); hit is False when the trie must be
+            (re)loaded from the database first
+        """
+        key = (method, path)
+        route = self.lookups.get(key, _MISS)
+        if route is not _MISS:
+            return True, route
+        
+        trie = self.get()
+        if trie is None:
+            return False, None
+        
+        route = trie.match(path, method)
+        self.lookups[key] = route
+        return True, route
+
+
+# Sentinel for lookup cache misses (None is a valid cached result)
+_MISS = object()
+
+# Route listing statements, built once so SQLAlchemy's compiled cache is hit
+# without rebuilding the Select on every call
+_ALL_ROUTES_STMT = select(RouteConfig).order_by(RouteConfig.priority.desc())
+_ACTIVE_ROUTES_STMT = (
+    select(RouteConfig)
+    .where(RouteConfig.is_active == True)
+    .order_by(RouteConfig.priority.desc())
+)
+
+# Rows fetched per round trip when streaming routes
+_ROUTE_BATCH_SIZE = 500
+
+# Global route table shared by all RoutingService instances
+route_table_cache = RouteTableCache(
+    ttl=settings.ROUTE_CACHE_TTL,
+    lookup_size=settings.ROUTE_LOOKUP_CACHE_SIZE,
+)
+
+
+async def resolve_route(path: str, method: str) -> Optional[RouteConfig]:
+    """Resolve the route for a request
+    
+    Served from the in-memory route table; the database is only read to
+    (re)load it, over the request's shared session, or a short-lived one
+    outside a request.
+    
+    Args:
+        path: Request path
+        method: HTTP method
+        
+    Returns:
+        Matched RouteConfig or None
+    """
+    hit, route = route_table_cache.lookup(path, method)
+    if hit:
+        return route
+    
+    db = get_request_session()
+    if db is not None:
+        return await RoutingService(db).match_route(path, method)
+    async with AsyncSessionLocal() as db:
+        return await RoutingService(db).match_route(path, method)
+
+
+async def publish_routes_changed():
+    """Tell every gateway instance to drop its cached route table"""
+    await publish_invalidation(settings.ROUTE_INVALIDATION_CHANNEL)
+
+
+async def listen_for_route_changes():
+    """Invalidate the local route table on pub/sub notifications"""
+    await listen_for_invalidations(settings.ROUTE_INVALIDATION_CHANNEL, route_table_cache)
 
 
 class RoutingService:
@@ -14,6 +129,25 @@ class RoutingService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
+    async def get_route_trie(self) -> RouteTrie:
+        """Get the compiled trie of active routes, loading it if needed"""
+        trie = route_table_cache.get()
+        if trie is not None:
+            return trie
+        
+        async with route_table_cache.lock:
+            # Another request may have rebuilt it while we waited
+            trie = route_table_cache.get()
+            if trie is None:
+                version = route_table_cache.version
+                # Index rows as they arrive instead of collecting them first
+                trie = RouteTrie()
+                async for route in self.iter_routes(active_only=True):
+                    trie.insert(route)
+                trie.finalize()
+                route_table_cache.set(trie, version)
+        return trie
+    
     async def match_route(self, path: str, method: str) -> Optional[RouteConfig]:
         """Match incoming request to a route configuration
         
@@ -24,22 +158,16 @@ class RoutingService:
         Returns:
             Matched RouteConfig or None
         """
-        # Get all active routes ordered by priority (higher first)
-        stmt = select(RouteConfig).where(
-            RouteConfig.is_active == True
-        ).order_by(RouteConfig.priority.desc())
+        hit, route = route_table_cache.lookup(path, method)
+        if hit:
+            return route
         
-        result = await self.db.execute(stmt)
-        routes = result.scalars().all()
-        
-        # Match path pattern and method
-        for route in routes:
-            # Convert pattern to match (e.g., /api/v1/auth/* -> /api/v1/auth/**)
-            pattern = route.path_pattern.replace('*', '**')
-            if fnmatch(path, pattern) and method in route.methods:
-                return route
-        
-        return None
+        version = route_table_cache.version
+        trie = await self.get_route_trie()
+        route = trie.match(path, method)
+        if version == route_table_cache.version:
+            route_table_cache.lookups[(method, path)] = route
+        return route
     
     async def get_route_by_id(self, route_id: str) -> Optional[RouteConfig]:
         """Get route by ID"""
@@ -56,44 +184,71 @@ class RoutingService:
         Returns:
             List of RouteConfig
         """
-        stmt = select(RouteConfig)
-        if active_only:
-            stmt = stmt.where(RouteConfig.is_active == True)
-        stmt = stmt.order_by(RouteConfig.priority.desc())
-        
+        stmt = _ACTIVE_ROUTES_STMT if active_only else _ALL_ROUTES_STMT
         result = await self.db.execute(stmt)
         return result.scalars().all()
     
+    async def iter_routes(self, active_only: bool = False) -> AsyncIterator[RouteConfig]:
+        """Stream routes in priority order
+        
+        Rows are fetched from a server-side cursor in batches, so the whole
+        result is never buffered at once.
+        
+        Args:
+            active_only: If True, yield only active routes
+            
+        Yields:
+            RouteConfig
+        """
+        stmt = _ACTIVE_ROUTES_STMT if active_only else _ALL_ROUTES_STMT
+        result = await self.db.stream_scalars(
+            stmt.execution_options(yield_per=_ROUTE_BATCH_SIZE)
+        )
+        async for route in result:
+            yield route
+    
     async def create_route(self, route_data: RouteConfigCreate) -> RouteConfig:
         """Create a new route configuration"""
         route = RouteConfig(**route_data.model_dump())
         self.db.add(route)
+        # Defaults (id, timestamps) are set client-side, so nothing is read back
         await self.db.commit()
-        await self.db.refresh(route)
+        await self._routes_changed()
         return route
     
     async def update_route(self, route_id: str, route_data: RouteConfigUpdate) -> Optional[RouteConfig]:
         """Update route configuration"""
-        route = await self.get_route_by_id(route_id)
+        values = route_data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_route_by_id(route_id)
+        
+        # Update fields and read the row back in one statement
+        stmt = (
+            update(RouteConfig)
+            .where(RouteConfig.id == route_id)
+            .values(**values)
+            .returning(RouteConfig)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        route = result.scalar_one_or_none()
         if not route:
             return None
         
-        # Update fields
-        for field, value in route_data.model_dump(exclude_unset=True).items():
-            setattr(route, field, value)
-        
         await self.db.commit()
-        await self.db.refresh(route)
+        await self._routes_changed()
         return route
     
     async def delete_route(self, route_id: str) -> bool:
         """Delete route configuration"""
-        route = await self.get_route_by_id(route_id)
-        if not route:
+        # Delete and learn whether the row existed in one statement
+        stmt = delete(RouteConfig).where(RouteConfig.id == route_id).returning(RouteConfig.id)
+        result = await self.db.execute(stmt)
+        if result.scalar_one_or_none() is None:
             return False
         
-        await self.db.delete(route)
         await self.db.commit()
+        await self._routes_changed()
         return True
     
     async def get_target_url(self, path: str, method: str) -> Optional[str]:
@@ -125,3 +280,8 @@ class RoutingService:
         if route:
             return route.is_public
         return False
+    
+    async def _routes_changed(self):
+        """Invalidate the route table here and on every other instance"""
+        route_table_cache.invalidate()
+        await publish_routes_changed()
@@ -0,0 +1,41 @@
+"""Store gateway_logs.client_ip as INET
+
+Revision ID: 4aaf8aeabf3a
+Revises: 7d4790b947c9
+Create Date: 2026-10-15 11:34:12.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4aaf8aeabf3a'
+down_revision = '7d4790b947c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Values that are not addresses (e.g. unix socket peers, "testclient")
+    # would fail a plain cast and abort the migration; store them as NULL
+    op.execute("""
+        CREATE FUNCTION pg_temp.try_inet(value text) RETURNS inet AS $$
+        BEGIN
+            RETURN value::inet;
+        EXCEPTION WHEN invalid_text_representation THEN
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql IMMUTABLE
+    """)
+    op.execute(
+        "ALTER TABLE gateway_logs ALTER COLUMN client_ip TYPE INET "
+        "USING pg_temp.try_inet(client_ip)"
+    )
+    op.execute("DROP FUNCTION pg_temp.try_inet(text)")
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.execute("ALTER TABLE gateway_logs ALTER COLUMN client_ip TYPE VARCHAR USING host(client_ip)")
@@ -0,0 +1,65 @@
+"""Add per-minute gateway log stats rollup
+
+Revision ID: 5dd6c85b3cfa
+Revises: 4aaf8aeabf3a
+Create Date: 2026-10-15 13:02:41.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5dd6c85b3cfa'
+down_revision = '4aaf8aeabf3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table(
+        'gateway_log_minute_stats',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('minute', sa.DateTime(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('target_service', sa.String(), server_default='', nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('successful', sa.Integer(), nullable=False),
+        sa.Column('response_time_sum', sa.Float(), nullable=False),
+        sa.Column('response_time_count', sa.Integer(), nullable=False),
+        sa.Column('response_time_min', sa.Float(), nullable=True),
+        sa.Column('response_time_max', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('minute', 'path', 'target_service', name='uq_gateway_log_minute_stats_key'),
+    )
+
+    # Roll up the logs already stored; new batches are added by the log writer
+    op.execute("""
+        INSERT INTO gateway_log_minute_stats (
+            id, minute, path, target_service, total, successful,
+            response_time_sum, response_time_count, response_time_min, response_time_max
+        )
+        SELECT
+            gen_random_uuid(),
+            date_trunc('minute', created_at),
+            path,
+            coalesce(target_service, ''),
+            count(*),
+            count(*) FILTER (WHERE status_code >= 200 AND status_code < 400),
+            coalesce(sum(response_time), 0),
+            count(response_time),
+            min(response_time),
+            max(response_time)
+        FROM gateway_logs
+        WHERE created_at IS NOT NULL
+        GROUP BY 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_table('gateway_log_minute_stats')
@@ -0,0 +1,57 @@
+"""Replace single-column gateway_logs indexes with query-shaped ones
+
+Revision ID: 5e9e126785de
+Revises: 1fea3c79cdd8
+Create Date: 2026-10-15 09:12:40.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9e126785de'
+down_revision = '1fea3c79cdd8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.drop_index('ix_gateway_logs_path', table_name='gateway_logs')
+    op.drop_index('ix_gateway_logs_client_ip', table_name='gateway_logs')
+    op.drop_index('ix_gateway_logs_target_service', table_name='gateway_logs')
+    op.drop_index('ix_gateway_logs_user_id', table_name='gateway_logs')
+    
+    op.create_index(
+        'ix_gateway_logs_target_service_created_at',
+        'gateway_logs',
+        ['target_service', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_gateway_logs_user_id_created_at',
+        'gateway_logs',
+        ['user_id', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('user_id IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_gateway_logs_errors_created_at',
+        'gateway_logs',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text('error_message IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('ix_gateway_logs_errors_created_at', table_name='gateway_logs')
+    op.drop_index('ix_gateway_logs_user_id_created_at', table_name='gateway_logs')
+    op.drop_index('ix_gateway_logs_target_service_created_at', table_name='gateway_logs')
+    
+    op.create_index('ix_gateway_logs_user_id', 'gateway_logs', ['user_id'], unique=False)
+    op.create_index('ix_gateway_logs_target_service', 'gateway_logs', ['target_service'], unique=False)
+    op.create_index('ix_gateway_logs_client_ip', 'gateway_logs', ['client_ip'], unique=False)
+    op.create_index('ix_gateway_logs_path', 'gateway_logs', ['path'], unique=False)
@@ -0,0 +1,46 @@
+"""Store limit_type and service status as SMALLINT codes
+
+Revision ID: 7d4790b947c9
+Revises: d10dd01feb19
+Create Date: 2026-10-15 11:02:47.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4790b947c9'
+down_revision = 'd10dd01feb19'
+branch_labels = None
+depends_on = None
+
+# (table, column, enum type, values in code order starting at 1); must match
+# LIMIT_TYPE_CODES and SERVICE_STATUS_CODES in the models
+_ENUM_COLUMNS = (
+    ('rate_limit_rules', 'limit_type', 'limittype', ('per_user', 'per_ip', 'per_endpoint', 'global')),
+    ('service_health', 'status', 'servicestatus', ('healthy', 'unhealthy', 'degraded', 'unknown')),
+)
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    for table, column, enum_name, values in _ENUM_COLUMNS:
+        cases = " ".join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(values, 1))
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE SMALLINT "
+            f"USING CASE lower({column}::text) {cases} END"
+        )
+        op.execute(f"DROP TYPE {enum_name}")
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    for table, column, enum_name, values in _ENUM_COLUMNS:
+        labels = ", ".join(f"'{value}'" for value in values)
+        cases = " ".join(f"WHEN {code} THEN '{value}'" for code, value in enumerate(values, 1))
+        op.execute(f"CREATE TYPE {enum_name} AS ENUM ({labels})")
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {enum_name} "
+            f"USING (CASE {column} {cases} END)::{enum_name}"
+        )
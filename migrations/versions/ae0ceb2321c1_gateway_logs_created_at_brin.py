@@ -0,0 +1,35 @@
+"""Index gateway_logs.created_at with BRIN instead of a B-tree
+
+Revision ID: ae0ceb2321c1
+Revises: 5e9e126785de
+Create Date: 2026-10-15 09:40:18.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ae0ceb2321c1'
+down_revision = '5e9e126785de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_index(
+        'ix_gateway_logs_created_at_brin',
+        'gateway_logs',
+        ['created_at'],
+        unique=False,
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32},
+    )
+    op.drop_index('ix_gateway_logs_created_at', table_name='gateway_logs')
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.create_index('ix_gateway_logs_created_at', 'gateway_logs', ['created_at'], unique=False)
+    op.drop_index('ix_gateway_logs_created_at_brin', table_name='gateway_logs')
@@ -0,0 +1,36 @@
+"""Add trigram index on gateway_logs.path
+
+Revision ID: b83e1f0c6a27
+Revises: 5dd6c85b3cfa
+Create Date: 2026-10-15 13:40:18.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83e1f0c6a27'
+down_revision = '5dd6c85b3cfa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Created on the partitioned parent, so every partition (current and
+    # future) gets its own copy
+    op.create_index(
+        'ix_gateway_logs_path_trgm',
+        'gateway_logs',
+        ['path'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'path': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('ix_gateway_logs_path_trgm', table_name='gateway_logs')
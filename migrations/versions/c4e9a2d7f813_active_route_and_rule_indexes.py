@@ -0,0 +1,51 @@
+"""Replace route and rate limit rule flag indexes with partial indexes
+
+Revision ID: c4e9a2d7f813
+Revises: b83e1f0c6a27
+Create Date: 2026-10-15 15:12:07.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a2d7f813'
+down_revision = 'b83e1f0c6a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Active routes are loaded in priority order
+    op.create_index(
+        'ix_route_configs_active_priority',
+        'route_configs',
+        [sa.text('priority DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+    op.drop_index('ix_route_configs_is_active', table_name='route_configs')
+    op.drop_index('ix_route_configs_priority', table_name='route_configs')
+
+    op.create_index(
+        'ix_rate_limit_rules_active_limit_type',
+        'rate_limit_rules',
+        ['limit_type'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+    op.drop_index('ix_rate_limit_rules_is_active', table_name='rate_limit_rules')
+    op.drop_index('ix_rate_limit_rules_limit_type', table_name='rate_limit_rules')
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.create_index('ix_rate_limit_rules_limit_type', 'rate_limit_rules', ['limit_type'], unique=False)
+    op.create_index('ix_rate_limit_rules_is_active', 'rate_limit_rules', ['is_active'], unique=False)
+    op.drop_index('ix_rate_limit_rules_active_limit_type', table_name='rate_limit_rules')
+
+    op.create_index('ix_route_configs_priority', 'route_configs', ['priority'], unique=False)
+    op.create_index('ix_route_configs_is_active', 'route_configs', ['is_active'], unique=False)
+    op.drop_index('ix_route_configs_active_priority', table_name='route_configs')
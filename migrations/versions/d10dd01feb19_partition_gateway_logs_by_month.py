@@ -0,0 +1,138 @@
+"""Partition gateway_logs by month on created_at
+
+Revision ID: d10dd01feb19
+Revises: ae0ceb2321c1
+Create Date: 2026-10-15 10:21:05.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd10dd01feb19'
+down_revision = 'ae0ceb2321c1'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    "id, request_id, method, path, target_service, user_id, client_ip, "
+    "status_code, response_time, error_message, created_at"
+)
+
+_INDEXES = (
+    'ix_gateway_logs_request_id',
+    'ix_gateway_logs_target_service_created_at',
+    'ix_gateway_logs_user_id_created_at',
+    'ix_gateway_logs_created_at_brin',
+    'ix_gateway_logs_errors_created_at',
+)
+
+
+def _create_gateway_logs(**kwargs) -> None:
+    """Create gateway_logs and its indexes"""
+    partitioned = 'postgresql_partition_by' in kwargs
+    op.create_table('gateway_logs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('request_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('method', sa.String(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('target_service', sa.String(), nullable=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('client_ip', sa.String(), nullable=True),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response_time', sa.Float(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        # The partition key must be part of the primary key
+        sa.Column('created_at', sa.DateTime(), nullable=not partitioned),
+        sa.PrimaryKeyConstraint('id', 'created_at') if partitioned else sa.PrimaryKeyConstraint('id'),
+        **kwargs
+    )
+    op.create_index('ix_gateway_logs_request_id', 'gateway_logs', ['request_id'], unique=False)
+    op.create_index(
+        'ix_gateway_logs_target_service_created_at',
+        'gateway_logs',
+        ['target_service', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_gateway_logs_user_id_created_at',
+        'gateway_logs',
+        ['user_id', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('user_id IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_gateway_logs_created_at_brin',
+        'gateway_logs',
+        ['created_at'],
+        unique=False,
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32},
+    )
+    op.create_index(
+        'ix_gateway_logs_errors_created_at',
+        'gateway_logs',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text('error_message IS NOT NULL'),
+    )
+
+
+def _set_aside_gateway_logs() -> None:
+    """Rename the current table and free its index and constraint names"""
+    for name in _INDEXES:
+        op.drop_index(name, table_name='gateway_logs')
+    op.execute("ALTER TABLE gateway_logs RENAME CONSTRAINT gateway_logs_pkey TO gateway_logs_old_pkey")
+    op.execute("ALTER TABLE gateway_logs RENAME TO gateway_logs_old")
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    _set_aside_gateway_logs()
+    _create_gateway_logs(postgresql_partition_by='RANGE (created_at)')
+    
+    # Catch-all for rows outside the monthly partitions
+    op.execute("CREATE TABLE gateway_logs_default PARTITION OF gateway_logs DEFAULT")
+    
+    # Monthly partitions from the oldest existing row through two months
+    # ahead; the application creates later ones (LogPartitionService)
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start timestamp := date_trunc(
+                'month',
+                coalesce((SELECT min(created_at) FROM gateway_logs_old), now() at time zone 'utc')
+            );
+        BEGIN
+            WHILE month_start <= date_trunc('month', now() at time zone 'utc') + interval '2 months' LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF gateway_logs FOR VALUES FROM (%L) TO (%L)',
+                    'gateway_logs_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    
+    op.execute(f"""
+        INSERT INTO gateway_logs ({_COLUMNS})
+        SELECT id, request_id, method, path, target_service, user_id, client_ip,
+               status_code, response_time, error_message,
+               coalesce(created_at, now() at time zone 'utc')
+        FROM gateway_logs_old
+    """)
+    op.drop_table('gateway_logs_old')
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    _set_aside_gateway_logs()
+    _create_gateway_logs()
+    
+    op.execute(f"INSERT INTO gateway_logs ({_COLUMNS}) SELECT {_COLUMNS} FROM gateway_logs_old")
+    # Drops every partition along with the partitioned table
+    op.drop_table('gateway_logs_old')
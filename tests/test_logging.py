@@ -0,0 +1,44 @@
+"""Tests for gateway log listing."""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gateway_log import GatewayLog
+from app.services.logging_service import LoggingService
+
+
+@pytest.mark.asyncio
+class TestLoggingService:
+    """Test logging service functionality."""
+    
+    async def test_get_logs_pages_through_equal_timestamps(self, db_session: AsyncSession):
+        """Test that logs sharing a created_at across a page boundary are not skipped."""
+        created_at = datetime(2026, 1, 1, 12, 0)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "request_id": uuid.uuid4(),
+                "method": "GET",
+                "path": "/api/v1/test",
+                "created_at": created_at,
+            }
+            for _ in range(5)
+        ]
+        await db_session.execute(insert(GatewayLog), rows)
+        await db_session.commit()
+        service = LoggingService(db_session)
+        
+        seen = []
+        before = before_id = None
+        while True:
+            page = await service.get_logs(limit=2, before=before, before_id=before_id)
+            seen.extend(log["id"] for log in page)
+            if len(page) < 2:
+                break
+            before, before_id = page[-1]["created_at"], page[-1]["id"]
+        
+        assert sorted(seen) == sorted(row["id"] for row in rows)
+        assert len(seen) == len(set(seen))
@@ -1,59 +1,62 @@
 """Tests for rate limiting service."""
 import pytest
 import asyncio
+import uuid
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from app.services.rate_limit_service import RateLimitService
-from app.models.rate_limit_rule import RateLimitRule
+from app.models.rate_limit_rule import LimitType, RateLimitRule
+from app.schemas.rate_limit_rule import RateLimitRuleCreate, RateLimitRuleUpdate
 
 
 @pytest.mark.asyncio
 class TestRateLimitService:
     """Test rate limiting service functionality."""
     
-    async def test_check_rate_limit_allowed(self, db_session: AsyncSession, sample_rate_limit_rule: dict):
+    async def test_check_rate_limit_allowed(
+        self,
+        db_session: AsyncSession,
+        sample_rate_limit_rule: dict,
+        fake_redis
+    ):
         """Test rate limit check when within limits."""
         service = RateLimitService(db_session)
         
-        result = await service.check_rate_limit(
+        is_allowed, status = await service.check_rate_limit(
             path="/api/v1/test",
-            client_id="user123"
+            user_id=uuid.uuid4()
         )
         
-        assert result["allowed"] is True
-        assert result["remaining"] > 0
+        assert is_allowed is True
+        assert status.remaining == sample_rate_limit_rule["limit"] - 1
     
-    async def test_check_rate_limit_exceeded(self, db_session: AsyncSession):
+    async def test_check_rate_limit_exceeded(
+        self,
+        db_session: AsyncSession,
+        sample_rate_limit_rule: dict,
+        fake_redis
+    ):
         """Test rate limit check when exceeded."""
         service = RateLimitService(db_session)
+        user_id = uuid.uuid4()
         
-        # Create rule with very low limit
-        rule = RateLimitRule(
-            path="/api/v1/limited",
-            limit=2,
-            window=60,
-            is_active=True
-        )
-        db_session.add(rule)
-        await db_session.commit()
-        
-        # Make requests up to limit
-        for i in range(2):
-            result = await service.check_rate_limit(
-                path="/api/v1/limited",
-                client_id="user456"
-            )
-            assert result["allowed"] is True
+        # Overlapping requests beyond the limit (2) are rejected atomically
+        results = await asyncio.gather(*(
+            service.check_rate_limit(path="/api/v1/limited", user_id=user_id)
+            for _ in range(3)
+        ))
+        assert sum(is_allowed for is_allowed, _ in results) == 2
         
         # Next request should be rate limited
-        result = await service.check_rate_limit(
+        is_allowed, status = await service.check_rate_limit(
             path="/api/v1/limited",
-            client_id="user456"
+            user_id=user_id
         )
         
-        assert result["allowed"] is False
-        assert result["remaining"] == 0
+        assert is_allowed is False
+        assert status.remaining == 0
     
     async def test_get_rate_limit_info(self, db_session: AsyncSession, sample_rate_limit_rule: dict):
         """Test getting rate limit information."""
@@ -101,38 +104,99 @@ class TestRateLimitService:
         assert len(rules) > 0
         assert all(isinstance(rule, RateLimitRule) for rule in rules)
     
-    async def test_create_rule(self, db_session: AsyncSession):
-        """Test creating new rate limit rule."""
+    async def test_create_rule(self, db_session: AsyncSession, sql_statements: list, fake_redis):
+        """Test creating new rate limit rule; cached rules are reloaded."""
         service = RateLimitService(db_session)
-        
-        rule_data = {
-            "path": "/api/v1/newrule",
-            "limit": 50,
-            "window": 60,
-            "is_active": True
-        }
+        before = await service.check_rate_limit(path="/api/v1/newrule", client_ip="10.0.0.1")
+        assert before == (True, None)
+        sql_statements.clear()
+        
+        rule_data = RateLimitRuleCreate(
+            rule_name="new-rule",
+            limit_type=LimitType.PER_IP,
+            path_pattern="/api/v1/newrule",
+            max_requests=50,
+            window_seconds=60,
+            is_active=True
+        )
         
         rule = await service.create_rule(rule_data)
         
         assert rule.id is not None
-        assert rule.path == "/api/v1/newrule"
-        assert rule.limit == 50
+        assert rule.path_pattern == "/api/v1/newrule"
+        assert rule.max_requests == 50
+        # One INSERT, and nothing read back after the commit
+        verbs = [statement.split()[0].upper() for statement in sql_statements]
+        assert [verb for verb in verbs if verb in ("INSERT", "SELECT")] == ["INSERT"]
+        _, status = await service.check_rate_limit(path="/api/v1/newrule", client_ip="10.0.0.1")
+        assert status.max_requests == 50
+    
+    async def test_create_rule_concurrent(self, db_engine: AsyncEngine, fake_redis):
+        """Test creating rules from many sessions at once.
+        
+        Each create holds a pooled connection, so this fails if the pool
+        (pool_size + max_overflow) is too small for the burst.
+        """
+        session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+        
+        async def create(index: int) -> RateLimitRule:
+            async with session_factory() as session:
+                return await RateLimitService(session).create_rule(RateLimitRuleCreate(
+                    rule_name=f"concurrent-rule-{index}",
+                    limit_type=LimitType.PER_IP,
+                    path_pattern=f"/api/v1/concurrent/{index}",
+                    max_requests=50,
+                    window_seconds=60,
+                    is_active=True
+                ))
+        
+        try:
+            rules = await asyncio.gather(*[create(index) for index in range(50)])
+            assert len({rule.id for rule in rules}) == 50
+        finally:
+            async with session_factory() as session:
+                await session.execute(
+                    delete(RateLimitRule).where(RateLimitRule.rule_name.like("concurrent-rule-%"))
+                )
+                await session.commit()
     
-    async def test_update_rule(self, db_session: AsyncSession, sample_rate_limit_rule: dict):
-        """Test updating rate limit rule."""
+    async def test_update_rule(
+        self,
+        db_session: AsyncSession,
+        sample_rate_limit_rule: dict,
+        fake_redis
+    ):
+        """Test updating rate limit rule; cached rules are reloaded."""
         service = RateLimitService(db_session)
+        user_id = uuid.uuid4()
         
-        update_data = {"limit": 200}
+        _, status = await service.check_rate_limit(path="/api/v1/test", user_id=user_id)
+        assert status.max_requests == 100
+        
+        update_data = RateLimitRuleUpdate(max_requests=200)
         rule = await service.update_rule(sample_rate_limit_rule["id"], update_data)
         
-        assert rule.limit == 200
+        assert rule.max_requests == 200
+        _, status = await service.check_rate_limit(path="/api/v1/test", user_id=user_id)
+        assert status.max_requests == 200
     
-    async def test_delete_rule(self, db_session: AsyncSession, sample_rate_limit_rule: dict):
-        """Test deleting rate limit rule."""
+    async def test_delete_rule(
+        self,
+        db_session: AsyncSession,
+        sample_rate_limit_rule: dict,
+        fake_redis
+    ):
+        """Test deleting rate limit rule; cached rules are reloaded."""
         service = RateLimitService(db_session)
+        user_id = uuid.uuid4()
+        
+        _, status = await service.check_rate_limit(path="/api/v1/test", user_id=user_id)
+        assert status is not None
         
         result = await service.delete_rule(sample_rate_limit_rule["id"])
+        
         assert result is True
+        assert await service.check_rate_limit(path="/api/v1/test", user_id=user_id) == (True, None)
 
 
 @pytest.mark.asyncio
@@ -1,40 +1,106 @@
 """Tests for routing service."""
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.routing_service import RoutingService
+from app.services.routing_service import RoutingService, route_table_cache
 from app.models.route_config import RouteConfig
 
 
+@pytest.fixture(autouse=True)
+def fresh_route_table():
+    """Load the route table from each test's database."""
+    route_table_cache.invalidate()
+    yield
+    route_table_cache.invalidate()
+
+
+@pytest.fixture
+async def many_routes(db_session: AsyncSession) -> int:
+    """Insert 100 active routes (and one inactive) in one executemany."""
+    rows = [
+        {
+            "path_pattern": f"/api/v1/service{index}/*",
+            "target_service": f"service-{index}",
+            "target_url": f"http://service-{index}:8000",
+            "methods": ["GET"],
+            "is_active": True,
+            "priority": index % 7,
+        }
+        for index in range(100)
+    ]
+    rows.append({**rows[0], "path_pattern": "/api/v1/inactive/*", "is_active": False})
+    await db_session.execute(insert(RouteConfig), rows)
+    await db_session.commit()
+    return 100
+
+
 @pytest.mark.asyncio
 class TestRoutingService:
     """Test routing service functionality."""
     
-    async def test_get_route_by_path(self, db_session: AsyncSession, sample_route_config: dict):
-        """Test getting route by path."""
+    async def test_get_route_by_path(
+        self,
+        db_session: AsyncSession,
+        sample_route_config: dict,
+        sql_statements: list
+    ):
+        """Test getting route by path; repeat lookups run no SQL."""
         service = RoutingService(db_session)
-        route = await service.get_route_by_path("/api/v1/test")
+        route = await service.match_route("/api/v1/test", "GET")
         
         assert route is not None
-        assert route.path == "/api/v1/test"
+        assert route.path_pattern == "/api/v1/test"
         assert route.target_service == "test-service"
         assert route.is_active is True
+        
+        sql_statements.clear()
+        again = await service.match_route("/api/v1/test", "GET")
+        
+        assert again is route
+        assert sql_statements == []
     
     async def test_get_route_not_found(self, db_session: AsyncSession):
         """Test getting non-existent route."""
         service = RoutingService(db_session)
-        route = await service.get_route_by_path("/nonexistent")
+        route = await service.match_route("/nonexistent", "GET")
         
         assert route is None
     
-    async def test_get_all_active_routes(self, db_session: AsyncSession, sample_route_config: dict):
-        """Test getting all active routes."""
+    async def test_get_all_active_routes(
+        self,
+        db_session: AsyncSession,
+        many_routes: int,
+        sql_statements: list
+    ):
+        """Test getting all active routes in one query."""
         service = RoutingService(db_session)
-        routes = await service.get_all_active_routes()
+        sql_statements.clear()
         
-        assert len(routes) > 0
+        routes = await service.get_all_routes(active_only=True)
+        
+        assert len(routes) == many_routes
         assert all(route.is_active for route in routes)
+        assert [route.priority for route in routes] == sorted(
+            (route.priority for route in routes), reverse=True
+        )
+        assert len(sql_statements) == 1
+    
+    async def test_iter_active_routes(self, db_session: AsyncSession, many_routes: int):
+        """Test streaming active routes, as the route table is loaded."""
+        service = RoutingService(db_session)
+        
+        streamed = [route async for route in service.iter_routes(active_only=True)]
+        
+        assert len(streamed) == many_routes
+        assert {route.id for route in streamed} == {
+            route.id for route in await service.get_all_routes(active_only=True)
+        }
+        priorities = [route.priority for route in streamed]
+        assert priorities == sorted(priorities, reverse=True)
+        trie = await service.get_route_trie()
+        assert len(trie) == many_routes
     
     async def test_create_route(self, db_session: AsyncSession):
         """Test creating new route."""
@@ -64,15 +130,24 @@ class TestRoutingService:
         
         assert route.rate_limit == 200
     
-    async def test_delete_route(self, db_session: AsyncSession, sample_route_config: dict):
-        """Test deleting route."""
+    async def test_delete_route(
+        self,
+        db_session: AsyncSession,
+        sample_route_config: dict,
+        sql_statements: list
+    ):
+        """Test deleting route in one round trip."""
         service = RoutingService(db_session)
+        sql_statements.clear()
         
         result = await service.delete_route(sample_route_config["id"])
         assert result is True
+        verbs = [statement.split()[0].upper() for statement in sql_statements]
+        assert [verb for verb in verbs if verb in ("DELETE", "SELECT")] == ["DELETE"]
+        assert await service.delete_route(sample_route_config["id"]) is False
         
-        # Verify route is deleted
-        route = await service.get_route_by_path(sample_route_config["path"])
+        # Verify route is deleted (and evicted from the route table)
+        route = await service.match_route(sample_route_config["path"], "GET")
         assert route is None
     
     async def test_match_route(self, db_session: AsyncSession, sample_route_config: dict):
@@ -0,0 +1,132 @@
+"""Unit tests for token validation in the auth service."""
+
+import asyncio
+import time
+
+import pytest
+from jose import jwt
+
+from app.core.config import settings
+from app.services.auth_service import AuthService, _peek_exp, _token_expiry
+
+
+def make_token(**claims) -> str:
+    """Sign a token with the gateway's key."""
+    claims.setdefault("user_id", "00000000-0000-0000-0000-000000000001")
+    claims.setdefault("exp", int(time.time()) + 3600)
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Count signature verifications."""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr("app.services.auth_service.jwt.decode", counting_decode)
+    return calls
+
+
+class TestTokenCache:
+    """Test caching of validated tokens."""
+
+    @pytest.mark.asyncio
+    async def test_valid_token_is_verified_once(self, decodes):
+        """Test that repeated validations are served from cache."""
+        service = AuthService()
+        token = make_token()
+
+        first = await service.validate_token(token)
+        second = await service.validate_token(token)
+
+        assert first["user_id"] == second["user_id"]
+        assert len(decodes) == 1
+        await service.close()
+
+    def test_cache_expiry_is_capped_at_exp(self):
+        """Test that a cached payload is never served past its exp."""
+        now = time.time()
+
+        assert _token_expiry(b"key", {"exp": now + 1}, now) == now + 1
+        assert _token_expiry(b"key", {}, now) == now + settings.AUTH_TOKEN_CACHE_TTL
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_cached_token(self, decodes):
+        """Test that an invalidated token is verified again."""
+        service = AuthService()
+        token = make_token()
+
+        await service.validate_token(token)
+        service.invalidate(token)
+        await service.validate_token(token)
+
+        assert len(decodes) == 2
+        await service.close()
+
+
+class TestExtractToken:
+    """Test Authorization header parsing."""
+
+    def test_bearer_token_is_extracted(self):
+        """Test that only non-empty Bearer tokens are accepted."""
+        service = AuthService()
+
+        assert service.extract_token("Bearer abc") == "abc"
+        assert service.extract_token("Bearer ") is None
+        assert service.extract_token("Basic abc") is None
+        assert service.extract_token("") is None
+        assert service.extract_token(None) is None
+
+
+class TestExpiredTokens:
+    """Test the unverified exp check."""
+
+    @pytest.mark.asyncio
+    async def test_expired_token_skips_verification(self, decodes, monkeypatch):
+        """Test that an expired token is rejected without decoding it."""
+        service = AuthService()
+
+        async def validate_remote(token):
+            raise AssertionError("expired token sent to the auth service")
+
+        monkeypatch.setattr(service, "_validate_remote", validate_remote)
+
+        assert await service.validate_token(make_token(exp=int(time.time()) - 10)) is None
+        assert decodes == []
+        await service.close()
+
+    def test_peek_exp_ignores_opaque_tokens(self):
+        """Test that non-JWT tokens have no exp."""
+        assert _peek_exp("opaque-token") is None
+        assert _peek_exp("a.!!!.c") is None
+        assert _peek_exp(make_token(exp=123)) == 123
+
+
+class TestRemoteValidation:
+    """Test validation through the Auth Service."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_remote_validations_are_coalesced(self, monkeypatch):
+        """Test that one remote call serves concurrent requests for a token."""
+        service = AuthService()
+        calls = []
+
+        async def validate_remote(token):
+            calls.append(token)
+            await asyncio.sleep(0.01)
+            return {"user_id": "remote"}
+
+        monkeypatch.setattr(service, "_validate_remote", validate_remote)
+
+        results = await asyncio.gather(
+            *(service.validate_token("opaque-token") for _ in range(5))
+        )
+
+        assert calls == ["opaque-token"]
+        assert all(result == {"user_id": "remote"} for result in results)
+        assert service._inflight == {}
+        await service.close()
@@ -0,0 +1,93 @@
+"""Unit tests for the in-memory circuit breaker."""
+
+from app.services.circuit_breaker_service import CircuitBreakerService, CircuitState
+
+
+def make_breaker(**kwargs) -> CircuitBreakerService:
+    """Breaker with small thresholds."""
+    options = {"failure_threshold": 2, "success_threshold": 2, "timeout": 60}
+    options.update(kwargs)
+    return CircuitBreakerService(**options)
+
+
+class TestCircuitBreaker:
+    """Test circuit state transitions."""
+
+    def test_unknown_service_is_available(self):
+        """Test that services start closed."""
+        breaker = make_breaker()
+
+        assert breaker.is_available("svc")
+        assert breaker.get_state("svc") == CircuitState.CLOSED
+
+    def test_failures_open_circuit(self):
+        """Test that reaching the failure threshold opens the circuit."""
+        breaker = make_breaker()
+
+        breaker.record_failure("svc")
+        assert breaker.is_available("svc")
+        breaker.record_failure("svc")
+
+        assert breaker.get_state("svc") == CircuitState.OPEN
+        assert not breaker.is_available("svc")
+
+    def test_half_open_successes_close_circuit(self):
+        """Test recovery through half-open after the timeout."""
+        breaker = make_breaker(timeout=0)
+        breaker.record_failure("svc")
+        breaker.record_failure("svc")
+
+        assert breaker.is_available("svc")
+        assert breaker.get_state("svc") == CircuitState.HALF_OPEN
+        breaker.record_success("svc")
+        assert breaker.is_available("svc")
+        breaker.record_success("svc")
+
+        assert breaker.get_state("svc") == CircuitState.CLOSED
+
+    def test_reset_closes_circuit(self):
+        """Test that a reset clears failures."""
+        breaker = make_breaker()
+        breaker.record_failure("svc")
+        breaker.record_failure("svc")
+
+        breaker.reset("svc")
+
+        info = breaker.get_circuit_info("svc")
+        assert info["state"] == CircuitState.CLOSED
+        assert info["failure_count"] == 0
+        assert info["is_available"]
+
+    def test_timeout_uses_elapsed_monotonic_time(self, monkeypatch):
+        """Test that the open timeout counts whole elapsed time."""
+        clock = [1000.0]
+        monkeypatch.setattr("app.services.circuit_breaker_service.time.monotonic", lambda: clock[0])
+        breaker = make_breaker(timeout=60)
+        breaker.record_failure("svc")
+        breaker.record_failure("svc")
+
+        clock[0] += 59
+        assert not breaker.is_available("svc")
+        clock[0] += 86400
+        assert breaker.is_available("svc")
+
+    def test_half_open_admits_one_probe(self, monkeypatch):
+        """Test that concurrent requests don't all probe a recovering service."""
+        clock = [1000.0]
+        monkeypatch.setattr("app.services.circuit_breaker_service.time.monotonic", lambda: clock[0])
+        breaker = make_breaker(timeout=60)
+        breaker.record_failure("svc")
+        breaker.record_failure("svc")
+        clock[0] += 60
+
+        assert breaker.is_available("svc")
+        assert not breaker.is_available("svc")
+        assert not breaker.get_circuit_info("svc")["is_available"]
+
+        # A probe that never reports back stops blocking after the timeout
+        clock[0] += 60
+        assert breaker.is_available("svc")
+        breaker.record_failure("svc")
+
+        assert breaker.get_state("svc") == CircuitState.OPEN
+        assert not breaker.is_available("svc")
@@ -0,0 +1,47 @@
+"""Unit tests for the CORS middleware origin checks."""
+
+from app.middleware.cors_middleware import CORSMiddleware
+
+
+def make_middleware(origin_set=None, wildcard_origins=None, **kwargs) -> CORSMiddleware:
+    """Build a CORS middleware around a no-op app."""
+    return CORSMiddleware(
+        None,
+        origin_set=origin_set,
+        wildcard_origins=wildcard_origins,
+        **kwargs,
+    )
+
+
+class TestCORSMiddleware:
+    """Test origin matching."""
+
+    def test_exact_origins(self):
+        """Test exact origin membership."""
+        middleware = make_middleware(origin_set=frozenset({"https://engadi.org"}))
+
+        assert middleware.is_allowed_origin("https://engadi.org")
+        assert not middleware.is_allowed_origin("http://engadi.org")
+
+    def test_wildcard_subdomains(self):
+        """Test that wildcard origins match subdomains only."""
+        middleware = make_middleware(wildcard_origins=frozenset({"https://.engadi.org"}))
+
+        assert middleware.is_allowed_origin("https://app.engadi.org")
+        assert middleware.is_allowed_origin("https://a.b.engadi.org")
+        assert not middleware.is_allowed_origin("https://engadi.org")
+        assert not middleware.is_allowed_origin("https://evilengadi.org")
+        assert not middleware.is_allowed_origin("http://app.engadi.org")
+
+    def test_defaults_to_allow_origins(self):
+        """Test fallback to the standard allow_origins list."""
+        middleware = make_middleware(allow_origins=["http://localhost:3000"])
+
+        assert middleware.is_allowed_origin("http://localhost:3000")
+        assert not middleware.is_allowed_origin("http://localhost:8000")
+
+    def test_allow_all(self):
+        """Test that "*" still allows every origin."""
+        middleware = make_middleware(allow_origins=["*"])
+
+        assert middleware.is_allowed_origin("https://anything.example")
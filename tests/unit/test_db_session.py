@@ -0,0 +1,35 @@
+"""Unit tests for the per-request shared database session."""
+
+import pytest
+
+from app.db.session import get_request_session, request_session_scope
+
+
+class TestRequestSession:
+    """Test the request-scoped session."""
+
+    @pytest.mark.asyncio
+    async def test_session_is_shared_within_scope(self):
+        """Test that one session is created lazily and reused."""
+        async with request_session_scope():
+            first = get_request_session()
+            second = get_request_session()
+
+            assert first is not None
+            assert first is second
+
+        assert get_request_session() is None
+
+    @pytest.mark.asyncio
+    async def test_scopes_do_not_share_sessions(self):
+        """Test that each request gets its own session."""
+        async with request_session_scope():
+            first = get_request_session()
+        async with request_session_scope():
+            second = get_request_session()
+
+        assert first is not second
+
+    def test_no_session_outside_scope(self):
+        """Test that no session is created outside a request."""
+        assert get_request_session() is None
@@ -0,0 +1,37 @@
+"""Unit tests for custom column types."""
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.rate_limit_rule import LIMIT_TYPE_CODES, LimitType, RateLimitRule
+from app.models.service_health import SERVICE_STATUS_CODES, ServiceStatus
+
+
+class TestSmallIntEnum:
+    """Test enum columns stored as SMALLINT codes."""
+
+    def test_round_trip(self):
+        """Test that members and their string values map to stable codes."""
+        column_type = RateLimitRule.__table__.c.limit_type.type
+
+        assert column_type.process_bind_param(LimitType.PER_IP, None) == 2
+        assert column_type.process_bind_param("global", None) == 4
+        assert column_type.process_result_value(1, None) is LimitType.PER_USER
+        assert column_type.process_bind_param(None, None) is None
+
+    def test_codes_cover_every_member(self):
+        """Test that no enum member is left without a code."""
+        assert set(LIMIT_TYPE_CODES) == set(LimitType)
+        assert set(SERVICE_STATUS_CODES) == set(ServiceStatus)
+        assert len(set(LIMIT_TYPE_CODES.values())) == len(LimitType)
+        assert len(set(SERVICE_STATUS_CODES.values())) == len(ServiceStatus)
+
+    def test_compiles_to_integer_literal(self):
+        """Test that filters bind the integer code."""
+        stmt = select(RateLimitRule.id).where(RateLimitRule.limit_type == LimitType.PER_IP)
+
+        compiled = stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+
+        assert "limit_type = 2" in str(compiled)
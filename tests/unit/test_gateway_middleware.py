@@ -0,0 +1,108 @@
+"""Unit tests for the fused gateway middleware."""
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.middleware.gateway_middleware import GatewayMiddleware
+from app.models.rate_limit_rule import LimitType
+from app.models.route_config import RouteConfig
+from app.services import log_writer
+from app.services.rate_limit_service import rate_limit_rules_cache
+from app.services.route_trie import RouteTrie
+from app.services.routing_service import RouteTableCache
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    """Collect queued log rows instead of writing them."""
+    rows = []
+    monkeypatch.setattr(
+        log_writer.gateway_log_writer, "enqueue", lambda **fields: rows.append(fields)
+    )
+    return rows
+
+
+@pytest.fixture
+def client(monkeypatch, logged, fake_redis, make_rule):
+    """Test app behind the gateway middleware with in-memory routes and rules."""
+    routes = RouteTableCache(ttl=60, lookup_size=100)
+    routes.set(RouteTrie([
+        RouteConfig(
+            path_pattern="/api/v1/public",
+            target_service="svc",
+            target_url="http://svc:8000",
+            methods=["GET"],
+            is_public=True,
+        ),
+        RouteConfig(
+            path_pattern="/api/v1/echo",
+            target_service="svc",
+            target_url="http://svc:8000",
+            methods=["GET"],
+            is_public=True,
+        ),
+    ]), routes.version)
+    monkeypatch.setattr("app.services.routing_service.route_table_cache", routes)
+    rate_limit_rules_cache.set(
+        [make_rule(max_requests=1, limit_type=LimitType.PER_IP)],
+        rate_limit_rules_cache.version,
+    )
+
+    app = FastAPI()
+
+    @app.get("/api/v1/public")
+    async def public(request: Request):
+        return {"request_id": request.state.request_id.hex}
+
+    @app.get("/api/v1/echo")
+    async def echo(response: Response):
+        response.headers["X-Request-ID"] = "upstream"
+        return {}
+
+    @app.get("/api/v1/private")
+    async def private():
+        return {}
+
+    app.add_middleware(GatewayMiddleware)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestGatewayMiddleware:
+    """Test logging, auth and rate limiting in one middleware."""
+
+    def test_public_route_is_logged_and_rate_limited(self, client, logged):
+        """Test request ID, rate limit headers, 429s and log rows."""
+        first = client.get("/api/v1/public")
+        second = client.get("/api/v1/public")
+
+        assert first.status_code == 200
+        assert first.headers["X-Request-ID"] == first.json()["request_id"]
+        assert first.headers["X-RateLimit-Remaining"] == "0"
+        assert second.status_code == 429
+        assert second.headers["Retry-After"] == "60"
+        assert [row["status_code"] for row in logged] == [200, 429]
+        assert logged[0]["request_id"].hex == first.headers["X-Request-ID"]
+
+    def test_protected_route_requires_token(self, client, logged):
+        """Test that a missing Authorization header is rejected."""
+        response = client.get("/api/v1/private")
+
+        again = client.get("/api/v1/private")
+
+        assert response.status_code == 401
+        assert response.json()["message"] == "Missing authorization header"
+        assert "X-Request-ID" in response.headers
+        assert logged[0]["status_code"] == 401
+        # The shared 401 response doesn't carry headers between requests
+        assert again.headers.get_list("X-Request-ID") != response.headers.get_list("X-Request-ID")
+        assert len(again.headers.get_list("X-Request-ID")) == 1
+
+    def test_injected_headers_replace_response_values(self, client):
+        """Test that the gateway request ID is not duplicated."""
+        response = client.get("/api/v1/echo")
+
+        assert response.status_code == 200
+        assert len(response.headers.get_list("X-Request-ID")) == 1
+        assert response.headers["X-Request-ID"] != "upstream"
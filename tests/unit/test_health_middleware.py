@@ -0,0 +1,47 @@
+"""Unit tests for the liveness fast path."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.middleware.health_middleware import HealthCheckMiddleware
+
+
+def make_client() -> TestClient:
+    """App whose own routes would fail if a probe reached them."""
+    app = FastAPI()
+
+    @app.get("/other")
+    async def other():
+        return {"reached": True}
+
+    @app.get(f"{settings.API_V1_STR}/health")
+    async def versioned_health():
+        return {"reached": True}
+
+    app.add_middleware(HealthCheckMiddleware)
+    return TestClient(app)
+
+
+class TestHealthCheckMiddleware:
+    """Test liveness responses served ahead of the app."""
+
+    def test_probe_path_is_answered_directly(self):
+        """Test the liveness path returns the static body."""
+        client = make_client()
+
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+
+        head = client.head("/health")
+        assert head.status_code == 200
+        assert head.content == b""
+
+    def test_other_requests_pass_through(self):
+        """Test that non-probe requests reach the app."""
+        client = make_client()
+
+        assert client.get("/other").json() == {"reached": True}
+        assert client.get(f"{settings.API_V1_STR}/health").json() == {"reached": True}
+        assert client.post("/health").status_code == 404
@@ -0,0 +1,119 @@
+"""Unit tests for downstream health checks."""
+
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.service_health import ServiceHealth, ServiceStatus
+from app.services.health_service import HealthService, invalidate_aggregated_health
+from app.services.proxy_service import ProxyService
+
+
+class FakeResult:
+    """Query result holding preloaded rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in that serves fixed rows and counts commits."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.commits = 0
+
+    async def execute(self, stmt):
+        return FakeResult(self.rows)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        pass
+
+
+class FakeProxy:
+    """Health probe that takes a fixed time and tracks concurrency."""
+
+    def __init__(self, healthy_urls):
+        self.healthy_urls = healthy_urls
+        self.running = 0
+        self.max_running = 0
+
+    async def health_check(self, service_url, timeout=5):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return service_url in self.healthy_urls, 10.0
+
+    # The real fan-out, over the fake probe above
+    health_check_many = ProxyService.health_check_many
+
+
+def make_service(name: str) -> ServiceHealth:
+    """Service record as loaded from the database."""
+    return ServiceHealth(
+        id=uuid.uuid4(),
+        service_name=name,
+        service_url=f"http://{name}:8000",
+        status=ServiceStatus.UNKNOWN,
+        error_count=0,
+        success_count=0,
+        circuit_open=False,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+
+class TestCheckAllServices:
+    """Test a full health check cycle."""
+
+    @pytest.mark.asyncio
+    async def test_services_are_probed_concurrently(self):
+        """Test that all probes are in flight at once."""
+        services = [make_service(f"svc{i}") for i in range(5)]
+        session = FakeSession(services)
+        health_service = HealthService(session)
+        proxy = FakeProxy({"http://svc0:8000"})
+        health_service.proxy_service = proxy
+
+        updated = await health_service.check_all_services()
+
+        assert proxy.max_running == 5
+        statuses = [service.status for service in updated[:2]]
+        assert statuses == [ServiceStatus.HEALTHY, ServiceStatus.UNKNOWN]
+        assert updated[1].error_count == 1
+        assert session.commits == 1
+
+
+class TestAggregatedHealth:
+    """Test the aggregated health summary."""
+
+    @pytest.mark.asyncio
+    async def test_summary_is_cached_until_a_check_completes(self):
+        """Test that repeated calls reuse the response until health changes."""
+        invalidate_aggregated_health()
+        services = [make_service("svc0"), make_service("svc1")]
+        session = FakeSession(services)
+        health_service = HealthService(session)
+        health_service.proxy_service = FakeProxy({"http://svc0:8000", "http://svc1:8000"})
+
+        first = await health_service.get_aggregated_health()
+        second = await health_service.get_aggregated_health()
+        await health_service.check_all_services()
+        third = await health_service.get_aggregated_health()
+
+        assert second is first
+        assert first.overall_status == ServiceStatus.UNKNOWN
+        assert third.overall_status == ServiceStatus.HEALTHY
+        invalidate_aggregated_health()
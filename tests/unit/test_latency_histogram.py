@@ -0,0 +1,42 @@
+"""Unit tests for the in-process latency histogram."""
+
+from app.services import latency_histogram as module
+from app.services.latency_histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Test streaming percentiles."""
+
+    def test_percentiles_are_approximately_exact(self):
+        """Test that percentiles are within the bucket precision."""
+        histogram = LatencyHistogram(window_minutes=60)
+        for value in range(1, 1001):
+            histogram.record(float(value))
+
+        total, (p50, p99) = histogram.percentiles((0.5, 0.99), minutes=1)
+
+        assert total == 1000
+        assert abs(p50 - 500) / 500 < 0.02
+        assert abs(p99 - 990) / 990 < 0.02
+
+    def test_empty_histogram_reports_zero(self):
+        """Test the no-traffic case."""
+        histogram = LatencyHistogram(window_minutes=60)
+
+        assert histogram.percentiles((0.5,), minutes=5) == (0, [0.0])
+
+    def test_old_minutes_are_excluded(self, monkeypatch):
+        """Test that the window and retention are applied per minute."""
+        clock = [600.0]
+        monkeypatch.setattr(module.time, "time", lambda: clock[0])
+        histogram = LatencyHistogram(window_minutes=2)
+        histogram.record(1000.0)
+        clock[0] += 60
+        histogram.record(1.0)
+
+        assert histogram.percentiles((0.5,), minutes=1)[0] == 1
+        assert histogram.percentiles((0.5,), minutes=2)[0] == 2
+
+        clock[0] += 60
+        histogram.record(1.0)
+        assert histogram.percentiles((0.5,), minutes=5)[0] == 2
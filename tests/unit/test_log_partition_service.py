@@ -0,0 +1,137 @@
+"""Unit tests for gateway log partition helpers."""
+
+from datetime import date, datetime
+
+import pytest
+
+from app.services import log_partition_service
+from app.services.log_partition_service import (
+    LogPartitionService,
+    expired_partitions,
+    month_start,
+    partition_name,
+)
+
+
+class FakeResult:
+    """Result of a catalog query."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar(self):
+        return self.rows[0]
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in that records SQL and answers the catalog queries."""
+
+    def __init__(self, partitions, fail_on=None):
+        self.partitions = partitions
+        self.fail_on = fail_on
+        self.sql = []
+        self.rollbacks = 0
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("partition constraint violated")
+        self.sql.append(sql)
+        if "pg_partitioned_table" in sql:
+            return FakeResult([True])
+        if "pg_inherits" in sql:
+            return FakeResult(self.partitions)
+        return FakeResult([])
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def frozen_today(monkeypatch):
+    """Pin "today" to 2026-10-15."""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime(2026, 10, 15)
+
+    monkeypatch.setattr(log_partition_service, "datetime", FrozenDatetime)
+
+
+class TestLogPartitions:
+    """Test monthly partition naming and retention."""
+
+    def test_month_start_crosses_years(self):
+        """Test month arithmetic across year boundaries."""
+        assert month_start(date(2026, 11, 17)) == date(2026, 11, 1)
+        assert month_start(date(2026, 11, 17), 2) == date(2027, 1, 1)
+        assert month_start(date(2026, 1, 5), -1) == date(2025, 12, 1)
+        assert partition_name(date(2027, 1, 1)) == "gateway_logs_2027_01"
+
+    def test_expired_partitions(self):
+        """Test that only whole months before the cutoff are expired."""
+        names = [
+            "gateway_logs_default",
+            "gateway_logs_2026_08",
+            "gateway_logs_2026_09",
+            "gateway_logs_2026_10",
+        ]
+
+        assert expired_partitions(names, date(2026, 9, 15)) == ["gateway_logs_2026_08"]
+        assert expired_partitions(names, date(2026, 10, 1)) == [
+            "gateway_logs_2026_08",
+            "gateway_logs_2026_09",
+        ]
+
+
+class TestLogPartitionService:
+    """Test partition creation and retention."""
+
+    @pytest.mark.asyncio
+    async def test_missing_partitions_move_rows_out_of_default(self, frozen_today):
+        """Test that a new month's rows are moved out of the default partition."""
+        session = FakeSession(["gateway_logs_default", "gateway_logs_2026_10"])
+
+        await LogPartitionService(session).ensure_partitions(months_ahead=1)
+
+        ddl = [sql for sql in session.sql if "pg_inherits" not in sql]
+        assert ddl == [
+            "ALTER TABLE gateway_logs DETACH PARTITION gateway_logs_default",
+            "CREATE TABLE gateway_logs_2026_11 PARTITION OF gateway_logs "
+            "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')",
+            "WITH moved AS (DELETE FROM gateway_logs_default "
+            "WHERE created_at >= '2026-11-01' AND created_at < '2026-12-01' RETURNING *) "
+            "INSERT INTO gateway_logs_2026_11 SELECT * FROM moved",
+            "ALTER TABLE gateway_logs ATTACH PARTITION gateway_logs_default DEFAULT",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_partitions_without_default_are_created_directly(self, frozen_today):
+        """Test plain creation when there is no default partition."""
+        session = FakeSession([])
+
+        await LogPartitionService(session).ensure_partitions(months_ahead=0)
+
+        assert session.sql[1:] == [
+            "CREATE TABLE gateway_logs_2026_10 PARTITION OF gateway_logs "
+            "FOR VALUES FROM ('2026-10-01') TO ('2026-11-01')",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_retention_runs_when_partition_creation_fails(self, frozen_today):
+        """Test that expired partitions are dropped even if creation fails."""
+        session = FakeSession(["gateway_logs_2024_01"], fail_on="CREATE TABLE")
+
+        await LogPartitionService(session).maintain()
+
+        assert session.rollbacks == 1
+        assert "DROP TABLE IF EXISTS gateway_logs_2024_01" in session.sql
@@ -0,0 +1,160 @@
+"""Unit tests for the batched gateway log writer."""
+
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.services.log_writer import (
+    _COPY_COLUMNS,
+    GatewayLogWriter,
+    _copy_records,
+    _minute_stats,
+    _parse_ip,
+)
+
+
+def make_writer(batches, **kwargs) -> GatewayLogWriter:
+    """Build a writer that records batches instead of inserting them."""
+    options = {"max_queue": 100, "batch_size": 10, "flush_interval": 0.01}
+    options.update(kwargs)
+    writer = GatewayLogWriter(**options)
+
+    async def record(rows):
+        batches.append(rows)
+
+    writer._write = record
+    return writer
+
+
+def log_fields(**kwargs):
+    """Minimal gateway log row."""
+    fields = {"request_id": uuid.uuid4(), "method": "GET", "path": "/api/v1/test"}
+    fields.update(kwargs)
+    return fields
+
+
+class TestGatewayLogWriter:
+    """Test log batching."""
+
+    @pytest.mark.asyncio
+    async def test_rows_are_written_in_batches(self):
+        """Test that queued rows are flushed together."""
+        batches = []
+        writer = make_writer(batches)
+        writer.start()
+
+        for _ in range(5):
+            assert writer.enqueue(**log_fields())
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+        assert [len(batch) for batch in batches] == [5]
+        assert all("created_at" in row for row in batches[0])
+
+    @pytest.mark.asyncio
+    async def test_batches_are_capped(self):
+        """Test that a backlog is split into batch_size chunks."""
+        batches = []
+        writer = make_writer(batches, batch_size=4)
+
+        for _ in range(10):
+            writer.enqueue(**log_fields())
+        writer.start()
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_rows(self):
+        """Test that enqueue never blocks when the queue is full."""
+        batches = []
+        writer = make_writer(batches, max_queue=2)
+
+        results = [writer.enqueue(**log_fields()) for _ in range(3)]
+
+        assert results == [True, True, False]
+        assert writer.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_drops_are_reported_once(self, caplog):
+        """Test that drops are logged with the next flush, not per request."""
+        batches = []
+        writer = make_writer(batches, max_queue=2)
+        for _ in range(4):
+            writer.enqueue(**log_fields())
+
+        writer.start()
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+        warnings = [record for record in caplog.records if "dropped 2 rows" in record.getMessage()]
+        assert len(warnings) == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_rows(self):
+        """Test that rows still queued at shutdown are written."""
+        batches = []
+        writer = make_writer(batches, flush_interval=10)
+        writer.start()
+
+        writer.enqueue(**log_fields())
+        writer.enqueue(**log_fields())
+        await asyncio.sleep(0)
+        await writer.stop()
+
+        assert sum(len(batch) for batch in batches) == 2
+
+    def test_client_ip_is_parsed_for_inet(self):
+        """Test that client addresses are parsed and non-IP peers dropped."""
+        assert str(_parse_ip("10.0.0.1")) == "10.0.0.1"
+        assert str(_parse_ip("::1")) == "::1"
+        assert _parse_ip("testclient") is None
+        assert _parse_ip(None) is None
+
+    def test_user_id_claim_is_parsed_for_uuid(self):
+        """Test that a non-UUID user_id claim is stored as NULL, not failing the batch."""
+        user_id = uuid.uuid4()
+        rows = [
+            log_fields(user_id=user_id),
+            log_fields(user_id=str(user_id)),
+            log_fields(user_id="admin"),
+            log_fields(user_id=12345),
+            log_fields(client_ip="testclient"),
+        ]
+
+        records = _copy_records(rows)
+
+        column = _COPY_COLUMNS.index("user_id")
+        assert [record[column] for record in records] == [user_id, user_id, None, None, None]
+        assert records[4][_COPY_COLUMNS.index("client_ip")] is None
+
+
+class TestMinuteStats:
+    """Test the per-minute rollup written with each batch."""
+
+    def test_rows_are_rolled_up_per_minute_path_and_service(self):
+        """Test counts, successes and response time aggregates."""
+        minute = datetime(2026, 1, 1, 12, 30)
+        rows = [
+            log_fields(created_at=minute.replace(second=5), status_code=200, response_time=3.0),
+            log_fields(created_at=minute.replace(second=50), status_code=500, response_time=1.0),
+            log_fields(created_at=minute.replace(second=55), status_code=None, response_time=None),
+            log_fields(created_at=minute, status_code=200, response_time=2.0, target_service="svc"),
+            log_fields(created_at=minute.replace(minute=31), status_code=302, response_time=4.0),
+        ]
+
+        stats = _minute_stats(rows)
+
+        assert [(s["minute"].minute, s["target_service"], s["total"]) for s in stats] == [
+            (30, "", 3),
+            (30, "svc", 1),
+            (31, "", 1),
+        ]
+        assert stats[0]["successful"] == 1
+        assert stats[0]["response_time_sum"] == 4.0
+        assert stats[0]["response_time_count"] == 2
+        assert (stats[0]["response_time_min"], stats[0]["response_time_max"]) == (1.0, 3.0)
+        assert stats[2]["successful"] == 1
@@ -0,0 +1,107 @@
+"""Unit tests for gateway log analytics."""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.logging_service import LoggingService
+
+
+class FakeResult:
+    """Query result holding preloaded rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def one(self):
+        return self.rows[0]
+
+    def mappings(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in that records the statements it runs."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(self.rows)
+
+
+def stats_row(**kwargs):
+    """Aggregated stats row."""
+    fields = {
+        "path": "/api/v1/a",
+        "target_service": "svc",
+        "total": 4,
+        "successful": 3,
+        "avg_time": 10.0,
+        "min_time": 1.0,
+        "max_time": 20.0,
+    }
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+class TestGatewayStats:
+    """Test stats aggregation."""
+
+    @pytest.mark.asyncio
+    async def test_top_endpoints_use_one_query(self):
+        """Test that successes come from the grouping query."""
+        session = FakeSession([stats_row(), stats_row(path="/api/v1/b")])
+
+        endpoints = await LoggingService(session)._get_top_endpoints(datetime.utcnow())
+
+        assert len(session.statements) == 1
+        assert [endpoint.failed_requests for endpoint in endpoints] == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_service_stats_use_one_query(self):
+        """Test per-service error rates from a single aggregation."""
+        session = FakeSession([stats_row()])
+
+        services = await LoggingService(session)._get_service_stats(datetime.utcnow())
+
+        assert len(session.statements) == 1
+        assert services[0].error_rate == 25.0
+
+    @pytest.mark.asyncio
+    async def test_gateway_stats_use_three_queries(self):
+        """Test that totals, endpoints and services are one query each."""
+        session = FakeSession([stats_row()])
+
+        stats = await LoggingService(session).get_gateway_stats(hours=1)
+
+        assert len(session.statements) == 3
+        assert stats.failed_requests == 1
+        assert stats.error_rate == 25.0
+
+
+class TestGetLogs:
+    """Test log listing pagination."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_breaks_timestamp_ties_by_id(self):
+        """Test that the cursor compares (created_at, id), in listing order."""
+        session = FakeSession([])
+
+        await LoggingService(session).get_logs(
+            limit=10,
+            before=datetime(2026, 1, 1, 12, 0),
+            before_id=uuid.uuid4(),
+        )
+
+        sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+        assert "(gateway_logs.created_at, gateway_logs.id) < (" in sql
+        assert "ORDER BY gateway_logs.created_at DESC, gateway_logs.id DESC" in sql
@@ -0,0 +1,318 @@
+"""Unit tests for request forwarding."""
+
+import asyncio
+import datetime
+import ssl
+import time
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import RequestReceived
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+from app.core.config import Settings
+from app.services import proxy_service
+from app.services.proxy_service import (
+    _STRIPPED_REQUEST_HEADERS,
+    ProxyService,
+    _build_target_url,
+    _forward_headers,
+)
+
+
+def make_proxy(handler) -> ProxyService:
+    """Proxy whose upstream clients are served by a mock handler."""
+    proxy = ProxyService()
+    proxy._new_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return proxy
+
+
+def write_localhost_cert(directory) -> tuple:
+    """Write a self-signed certificate for localhost; returns (cert, key) paths."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = directory / "cert.pem"
+    key_path = directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    return cert_path, key_path
+
+
+async def start_h2_server(cert_path, key_path, connections: list) -> asyncio.AbstractServer:
+    """Minimal HTTP/2 (TLS, ALPN "h2") server answering every stream with "ok"."""
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    context.set_alpn_protocols(["h2"])
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connections.append(writer)
+        conn = H2Connection(H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        while data := await reader.read(65536):
+            for event in conn.receive_data(data):
+                if isinstance(event, RequestReceived):
+                    conn.send_headers(
+                        event.stream_id, [(":status", "200"), ("content-length", "2")]
+                    )
+                    conn.send_data(event.stream_id, b"ok", end_stream=True)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "localhost", 0, ssl=context)
+
+
+# Request headers of a typical proxied API call
+TYPICAL_HEADERS = [
+    (b"host", b"gateway"),
+    (b"connection", b"keep-alive"),
+    (b"user-agent", b"client/1.0"),
+    (b"accept", b"application/json"),
+    (b"accept-encoding", b"gzip"),
+    (b"authorization", b"Bearer token"),
+    (b"content-type", b"application/json"),
+    (b"x-forwarded-for", b"10.0.0.1"),
+]
+
+
+class TestProxyService:
+    """Test request forwarding."""
+
+    @pytest.mark.asyncio
+    async def test_hop_by_hop_and_gateway_headers_are_replaced(self):
+        """Test that hop-by-hop, Connection-listed and spoofed headers are dropped."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+        proxy = make_proxy(handler)
+        response = await proxy.stream_request(
+            target_url="http://svc:8000",
+            target_service="svc",
+            method="GET",
+            path="/api/v1/items",
+            headers=[
+                (b"host", b"gateway"),
+                (b"connection", b"keep-alive, X-Hop"),
+                (b"x-hop", b"1"),
+                (b"x-user-id", b"spoofed"),
+                (b"accept", b"application/json"),
+            ],
+            query_string=b"a=1",
+            request_id="abc",
+        )
+        body = b"".join([chunk async for chunk in response.body])
+        await proxy.close()
+
+        headers = seen[0].headers
+        assert body == b"ok"
+        assert str(seen[0].url) == "http://svc:8000/api/v1/items?a=1"
+        assert headers["host"] == "svc:8000"
+        assert "x-hop" not in headers
+        assert "x-user-id" not in headers
+        assert headers["accept"] == "application/json"
+        assert headers["x-request-id"] == "abc"
+
+    @pytest.mark.asyncio
+    async def test_last_failed_attempt_is_raised(self, monkeypatch):
+        """Test that failures are retried and the last error is raised without a final sleep."""
+        attempts = []
+        sleeps = []
+
+        def handler(request):
+            attempts.append(request)
+            raise httpx.ConnectError("refused")
+
+        async def sleep(delay):
+            sleeps.append(delay)
+
+        monkeypatch.setattr("app.services.proxy_service.asyncio.sleep", sleep)
+        proxy = make_proxy(handler)
+
+        with pytest.raises(httpx.ConnectError):
+            await proxy.stream_request(
+                target_url="http://svc:8000",
+                target_service="svc",
+                method="GET",
+                path="/",
+                headers=[],
+                retry_count=3,
+            )
+        await proxy.close()
+
+        assert len(attempts) == 3
+        assert len(sleeps) == 2
+        assert sleeps[1] >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_clients_are_pooled_per_upstream_host(self):
+        """Test that requests to one host reuse its client and other hosts get their own."""
+        proxy = ProxyService()
+
+        first = proxy._get_client("http://svc:8000")
+        again = proxy._get_client("http://svc:8000/")
+        other = proxy._get_client("http://other:8000")
+        await proxy.close()
+
+        assert first is again
+        assert other is not first
+        assert proxy._clients == {}
+
+    @pytest.mark.asyncio
+    async def test_client_limits_come_from_config(self, monkeypatch):
+        """Test that the upstream pool is capped by settings, overridable from the env."""
+        default = ProxyService._new_client()
+        pool = default._transport._pool
+        assert pool._max_connections == proxy_service.settings.GATEWAY_MAX_CONNECTIONS
+        keepalive = proxy_service.settings.GATEWAY_MAX_KEEPALIVE_CONNECTIONS
+        assert pool._max_keepalive_connections == keepalive
+        await default.aclose()
+
+        monkeypatch.setenv("GATEWAY_MAX_CONNECTIONS", "64")
+        monkeypatch.setenv("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", "16")
+        monkeypatch.setattr(proxy_service, "settings", Settings())
+        client = ProxyService._new_client()
+        pool = client._transport._pool
+        await client.aclose()
+
+        # Beyond the cap, requests queue in the pool instead of opening
+        # more connections to an upstream that is already struggling
+        assert pool._max_connections == 64
+        assert pool._max_keepalive_connections == 16
+
+    @pytest.mark.asyncio
+    async def test_http2_requests_share_one_connection(self, tmp_path, monkeypatch):
+        """Test that concurrent requests to one host multiplex over one connection.
+
+        Over HTTP/1.1 the same burst would open one socket per in-flight
+        request (up to GATEWAY_MAX_CONNECTIONS) and keep up to
+        GATEWAY_MAX_KEEPALIVE_CONNECTIONS of them open afterwards.
+        """
+        cert_path, key_path = write_localhost_cert(tmp_path)
+        monkeypatch.setenv("SSL_CERT_FILE", str(cert_path))
+        connections = []
+        server = await start_h2_server(cert_path, key_path, connections)
+        port = server.sockets[0].getsockname()[1]
+        proxy = ProxyService()
+
+        async def forward() -> bytes:
+            response = await proxy.stream_request(
+                target_url=f"https://localhost:{port}",
+                target_service="svc",
+                method="GET",
+                path="/api/v1/items",
+                headers=[],
+            )
+            return b"".join([chunk async for chunk in response.body])
+
+        try:
+            bodies = await asyncio.gather(*[forward() for _ in range(100)])
+        finally:
+            await proxy.close()
+            server.close()
+            await server.wait_closed()
+
+        assert bodies == [b"ok"] * 100
+        assert len(connections) == 1
+
+    def test_forward_headers(self):
+        """Test the headers built for a typical request."""
+        forwarded = _forward_headers(TYPICAL_HEADERS, uuid.uuid4(), "abc")
+
+        names = [name for name, _ in forwarded]
+        assert b"host" not in names
+        assert b"connection" not in names
+        assert b"keep-alive" not in names
+        assert names[:6] == [name for name, _ in TYPICAL_HEADERS[2:]]
+        assert names[-3:] == [b"x-user-id", b"x-request-id", b"x-forwarded-by"]
+
+    @pytest.mark.benchmark
+    def test_forward_headers_are_built_quickly(self):
+        """Benchmark: header filtering stays a single cheap pass per request."""
+        user_id = uuid.uuid4()
+
+        start = time.perf_counter()
+        for _ in range(100_000):
+            _forward_headers(TYPICAL_HEADERS, user_id, "abc")
+        elapsed = time.perf_counter() - start
+
+        # About 2us per call here; generous for slow machines
+        assert elapsed < 2.0
+
+
+header_names = st.sampled_from([
+    b"host", b"connection", b"keep-alive", b"te", b"upgrade", b"x-user-id",
+    b"x-request-id", b"accept", b"authorization", b"x-custom", b"x-hop",
+])
+header_values = st.binary(max_size=20).filter(lambda value: b"," not in value) | st.sampled_from([
+    b"keep-alive", b"close", b"x-hop", b"keep-alive, x-custom",
+])
+
+
+class TestProxyProperties:
+    """Property-based tests for URL and header building."""
+
+    @hypothesis_settings(deadline=None)
+    @given(
+        path=st.text(alphabet="abc/0123", min_size=1).map(lambda path: "/" + path),
+        params=st.lists(st.tuples(st.text(min_size=1), st.text())),
+    )
+    def test_query_string_round_trips(self, path, params):
+        """Test that any encoded query reaches the upstream unchanged."""
+        query_string = urlencode(params).encode("ascii")
+
+        url = _build_target_url("http://svc:8000/", path, query_string)
+
+        parts = urlsplit(url)
+        assert parts.netloc == "svc:8000"
+        assert parts.path == path
+        assert parse_qsl(parts.query, keep_blank_values=True) == params
+        assert url.endswith("?" + query_string.decode("ascii")) == bool(params)
+
+    @hypothesis_settings(deadline=None)
+    @given(headers=st.lists(st.tuples(header_names, header_values), max_size=12))
+    def test_only_hop_by_hop_and_gateway_headers_are_dropped(self, headers):
+        """Test that other headers are forwarded unchanged and in order."""
+        forwarded = _forward_headers(headers, None, "abc")
+
+        listed = {
+            token.strip().lower()
+            for name, value in headers if name == b"connection"
+            for token in value.split(b",")
+        }
+        expected = [
+            (name, value) for name, value in headers
+            if name not in _STRIPPED_REQUEST_HEADERS and name not in listed
+        ]
+        assert forwarded == expected + [
+            (b"x-request-id", b"abc"),
+            (b"x-forwarded-by", b"Mission-Engadi-Gateway"),
+        ]
@@ -0,0 +1,148 @@
+"""Unit tests for Redis-backed rate limiting."""
+
+import asyncio
+
+import pytest
+from cachetools import LRUCache
+from fakeredis import aioredis
+
+from app.models.rate_limit_rule import LimitType
+from app.services import rate_limit_service
+from app.services.rate_limit_service import RateLimitService, rate_limit_rules_cache
+
+
+@pytest.fixture
+def cached_rules():
+    """Seed the rules cache so no database session is needed."""
+    def seed(*rules):
+        rate_limit_rules_cache.set(list(rules), rate_limit_rules_cache.version)
+    yield seed
+    rate_limit_rules_cache.invalidate()
+
+
+class TestRateLimitService:
+    """Test rate limit checks."""
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_limit(self, fake_redis, cached_rules, make_rule):
+        """Test that requests beyond the limit are rejected."""
+        cached_rules(make_rule(max_requests=2))
+        service = RateLimitService(db=None)
+
+        first = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        second = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        third = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        other = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.2")
+
+        assert first[0] and first[1].remaining == 1
+        assert second[0] and second[1].remaining == 0
+        assert third[0] is False and third[1].current_requests == 2
+        assert other[0] and other[1].remaining == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit, burst", [(2, 3), (50, 100)])
+    async def test_concurrent_burst_is_limited_exactly(
+        self, fake_redis, cached_rules, make_rule, limit, burst
+    ):
+        """Test that overlapping checks admit exactly the limit."""
+        cached_rules(make_rule(max_requests=limit))
+        service = RateLimitService(db=None)
+
+        results = await asyncio.gather(*(
+            service.check_rate_limit("/api/v1/limited", client_ip="10.0.0.1")
+            for _ in range(burst)
+        ))
+
+        assert sum(is_allowed for is_allowed, _ in results) == limit
+
+    @pytest.mark.asyncio
+    async def test_tokens_refill_over_the_window(
+        self, monkeypatch, fake_redis, cached_rules, make_rule
+    ):
+        """Test that a drained bucket admits requests again as it refills."""
+        cached_rules(make_rule(max_requests=10, window_seconds=1))
+        service = RateLimitService(db=None)
+        now = [1_700_000_000.0]
+        monkeypatch.setattr(rate_limit_service.time, "time", lambda: now[0])
+
+        for _ in range(10):
+            assert (await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1"))[0]
+        is_allowed, status = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        assert is_allowed is False and status.remaining == 0
+
+        # One token is added every 100ms
+        now[0] += 0.05
+        assert (await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1"))[0] is False
+        now[0] += 0.05
+
+        assert (await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1"))[0]
+
+    @pytest.mark.asyncio
+    async def test_path_pattern_filters_rules(self, fake_redis, cached_rules, make_rule):
+        """Test that rules only apply under their path prefix."""
+        cached_rules(make_rule(max_requests=1, path_pattern="/api/v1/limited"))
+        service = RateLimitService(db=None)
+
+        for _ in range(3):
+            is_allowed, status = await service.check_rate_limit(
+                "/api/v1/open", client_ip="10.0.0.1"
+            )
+            assert is_allowed and status is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("connected", [True, False])
+    async def test_all_rules_are_checked(self, monkeypatch, cached_rules, make_rule, connected):
+        """Test that the tightest of several applicable rules is reported."""
+        monkeypatch.setattr(
+            rate_limit_service, "redis_client", aioredis.FakeRedis(connected=connected)
+        )
+        monkeypatch.setattr(rate_limit_service, "_local_buckets", {})
+        cached_rules(
+            make_rule(max_requests=5, limit_type=LimitType.GLOBAL),
+            make_rule(max_requests=2, path_pattern="/api/v1/items"),
+        )
+        service = RateLimitService(db=None)
+
+        first = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        third = await service.check_rate_limit("/api/v1/items", client_ip="10.0.0.1")
+        other = await service.check_rate_limit("/api/v1/other", client_ip="10.0.0.1")
+
+        assert first[0] and first[1].remaining == 1
+        assert third[0] is False and third[1].max_requests == 2
+        # The request the per-IP rule rejected took no global token
+        assert other[0] and other[1].remaining == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_without_redis(self, monkeypatch, cached_rules, make_rule):
+        """Test the in-memory fallback when Redis is unreachable."""
+        monkeypatch.setattr(rate_limit_service, "redis_client", aioredis.FakeRedis(connected=False))
+        monkeypatch.setattr(rate_limit_service, "_local_buckets", {})
+        cached_rules(make_rule(max_requests=1, limit_type=LimitType.GLOBAL))
+        service = RateLimitService(db=None)
+
+        assert (await service.check_rate_limit("/api/v1/items"))[0] is True
+        assert (await service.check_rate_limit("/api/v1/items"))[0] is False
+
+    @pytest.mark.asyncio
+    async def test_memory_fallback_is_bounded(self, monkeypatch, cached_rules, make_rule):
+        """Test that the least recently used fallback buckets are dropped."""
+        monkeypatch.setattr(rate_limit_service, "redis_client", aioredis.FakeRedis(connected=False))
+        monkeypatch.setattr(rate_limit_service, "_local_buckets", LRUCache(maxsize=2))
+        cached_rules(make_rule(max_requests=1))
+        service = RateLimitService(db=None)
+
+        for client_ip in ("10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.3"):
+            await service.check_rate_limit("/api/v1/items", client_ip=client_ip)
+
+        kept = [key.split(":")[1] for key in rate_limit_service._local_buckets]
+        assert kept == ["10.0.0.1", "10.0.0.3"]
+
+    def test_invalidate_drops_cached_rules(self, cached_rules, make_rule):
+        """Test that invalidation forces a reload."""
+        cached_rules(make_rule())
+        assert rate_limit_rules_cache.get() is not None
+
+        rate_limit_rules_cache.invalidate()
+
+        assert rate_limit_rules_cache.get() is None
@@ -0,0 +1,82 @@
+"""Unit tests for the process-wide route table cache."""
+
+import asyncio
+
+import pytest
+from fakeredis import aioredis
+
+from app.models.route_config import RouteConfig
+from app.services.route_trie import RouteTrie
+from app.services import cache_invalidation, routing_service
+from app.services.routing_service import RouteTableCache
+
+
+def make_cache(*routes: RouteConfig) -> RouteTableCache:
+    """Build a cache holding a trie of the given routes."""
+    cache = RouteTableCache(ttl=60, lookup_size=100)
+    cache.set(RouteTrie(routes), cache.version)
+    return cache
+
+
+class TestRouteTableCache:
+    """Test in-memory route resolution."""
+
+    def test_lookup_misses_until_loaded(self):
+        """Test that an empty cache asks callers to load routes."""
+        cache = RouteTableCache(ttl=60, lookup_size=100)
+
+        assert cache.lookup("/api/v1/test", "GET") == (False, None)
+
+    def test_lookup_resolves_and_memoizes(self):
+        """Test lookups against a loaded trie, including no-match results."""
+        route = RouteConfig(
+            path_pattern="/api/v1/test/*",
+            target_service="svc",
+            target_url="http://svc:8000",
+            methods=["GET"],
+            is_public=True,
+        )
+        cache = make_cache(route)
+
+        assert cache.lookup("/api/v1/test/1", "GET") == (True, route)
+        assert cache.lookup("/api/v1/other", "GET") == (True, None)
+        assert cache.lookups[("GET", "/api/v1/test/1")] is route
+
+    def test_invalidate_forces_reload(self):
+        """Test that invalidation drops the trie and memoized lookups."""
+        cache = make_cache()
+        cache.lookup("/api/v1/test", "GET")
+
+        cache.invalidate()
+
+        assert cache.lookup("/api/v1/test", "GET") == (False, None)
+        assert len(cache.lookups) == 0
+
+    def test_stale_version_is_not_stored(self):
+        """Test that a reload started before an invalidation is discarded."""
+        cache = RouteTableCache(ttl=60, lookup_size=100)
+        version = cache.version
+        cache.invalidate()
+
+        cache.set(RouteTrie(), version)
+
+        assert cache.get() is None
+
+    @pytest.mark.asyncio
+    async def test_route_change_notification_invalidates(self, monkeypatch):
+        """Test that a published route change drops the cached trie."""
+        client = aioredis.FakeRedis()
+        cache = make_cache()
+        monkeypatch.setattr(cache_invalidation, "redis_client", client)
+        monkeypatch.setattr(routing_service, "route_table_cache", cache)
+        listener = asyncio.create_task(routing_service.listen_for_route_changes())
+        try:
+            await asyncio.sleep(0.05)
+            assert cache.get() is not None
+
+            await routing_service.publish_routes_changed()
+            await asyncio.sleep(0.05)
+
+            assert cache.get() is None
+        finally:
+            listener.cancel()